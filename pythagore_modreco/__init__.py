@@ -27,4 +27,37 @@
 #
 # 2022 November 25
 
-from ._version import __version__ # NOQA
+from importlib import import_module
+from ._version import __version__  # NOQA
+
+# submodules are imported on first access, e.g. pythagore_modreco.data, so
+# that only the ones depending on TensorFlow load it
+_SUBMODULES = [
+    "augmentation",
+    "bench",
+    "bucketing",
+    "callbacks",
+    "cascade",
+    "costs",
+    "data",
+    "distillation",
+    "evaluation",
+    "neural_nets_keras",
+    "numpy_engine",
+    "preprocessing",
+    "quantization",
+    "registry",
+    "runner",
+    "serving",
+    "store",
+    "streaming",
+    "synthetic",
+    "tf_data",
+    "utils",
+]
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,155 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from numpy import arange, clip, einsum, exp, floor, pi, sqrt, stack
+from numpy.random import default_rng
+
+"""
+On-the-fly impairments of I/Q batches: sample-rate offset, time shift,
+frequency offset, phase rotation and additive white Gaussian noise
+"""
+
+
+class Augmenter:
+    """Apply random impairments to a batch of I/Q signals
+
+    Every impairment is drawn independently for each signal and applied to
+    the whole batch with vectorized operations. Frequency offsets are given
+    as a fraction of the sample rate.
+
+    Args:
+        max_frequency_offset (float, optional): frequency offsets are drawn
+            uniformly in [-max_frequency_offset, max_frequency_offset].
+            Defaults to 0.
+        phase_rotation (bool, optional): apply a uniform random phase.
+            Defaults to True.
+        snr_range (tuple of float, optional): (min, max) SNR in dB of the added
+            noise, drawn uniformly. If None no noise is added. Defaults to None.
+        max_time_shift (int, optional): signals are circularly shifted by up to
+            this number of samples. Defaults to 0.
+        max_sample_rate_offset (float, optional): signals are resampled with a
+            relative sample-rate error drawn uniformly in
+            [-max_sample_rate_offset, max_sample_rate_offset]. Defaults to 0.
+        normalize (bool, optional): normalize the power of each signal after
+            the impairments, as done by preprocessing. Defaults to True.
+        seed (None, int or numpy.random.Generator, optional): random seed or
+            generator. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        max_frequency_offset=0.0,
+        phase_rotation=True,
+        snr_range=None,
+        max_time_shift=0,
+        max_sample_rate_offset=0.0,
+        normalize=True,
+        seed=None,
+    ):
+        self.max_frequency_offset = max_frequency_offset
+        self.phase_rotation = phase_rotation
+        self.snr_range = snr_range
+        self.max_time_shift = max_time_shift
+        self.max_sample_rate_offset = max_sample_rate_offset
+        self.normalize = normalize
+        self.rng = default_rng(seed)
+
+    def _resample(self, z, ratio):
+        """Linear interpolation of each signal at times t * ratio"""
+        n, length = z.shape
+        t = clip(arange(length) * ratio[:, None], 0, length - 1)
+        i0 = floor(t).astype("int64")
+        i1 = clip(i0 + 1, 0, length - 1)
+        w = (t - i0).astype("float32")
+        rows = arange(n)[:, None]
+        return z[rows, i0] * (1 - w) + z[rows, i1] * w
+
+    def __call__(self, x, return_params=False):
+        """Impair a batch of signals
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            return_params (bool, optional): also return the drawn parameters.
+                Defaults to False.
+
+        Returns:
+            (array): float32 impaired signals, shape (n, length, 2), and the
+                dict of drawn parameters if return_params
+        """
+        n, length, _ = x.shape
+        z = x[..., 0] + 1j * x[..., 1].astype("complex64")
+        params = dict()
+
+        if self.max_sample_rate_offset:
+            offset = self.rng.uniform(
+                -self.max_sample_rate_offset, self.max_sample_rate_offset, n
+            )
+            z = self._resample(z, 1.0 + offset)
+            params["sample_rate_offset"] = offset
+
+        if self.max_time_shift:
+            shift = self.rng.integers(-self.max_time_shift, self.max_time_shift + 1, n)
+            idx = (arange(length)[None, :] - shift[:, None]) % length
+            z = z[arange(n)[:, None], idx]
+            params["time_shift"] = shift
+
+        angle = None
+        if self.max_frequency_offset:
+            fo = self.rng.uniform(
+                -self.max_frequency_offset, self.max_frequency_offset, n
+            )
+            angle = 2 * pi * fo[:, None] * arange(length)[None, :]
+            params["frequency_offset"] = fo
+        if self.phase_rotation:
+            phase = self.rng.uniform(0, 2 * pi, n)
+            angle = phase[:, None] if angle is None else angle + phase[:, None]
+            params["phase"] = phase
+        if angle is not None:
+            z = z * exp(1j * angle).astype("complex64")
+
+        if self.snr_range is not None:
+            snr = self.rng.uniform(self.snr_range[0], self.snr_range[1], n)
+            power = einsum("ij,ij->i", z.real, z.real) + einsum(
+                "ij,ij->i", z.imag, z.imag
+            )
+            sigma = sqrt(power / length / 10 ** (snr / 10) / 2).astype("float32")
+            z = z + sigma[:, None] * (
+                self.rng.standard_normal((n, length), dtype="float32")
+                + 1j * self.rng.standard_normal((n, length), dtype="float32")
+            )
+            params["snr"] = snr
+
+        out = stack([z.real, z.imag], axis=-1).astype("float32")
+        if self.normalize:
+            power = einsum("ijk,ijk->i", out, out) / (2 * length)
+            out /= sqrt(power)[:, None, None]
+
+        if return_params:
+            return out, params
+        return out
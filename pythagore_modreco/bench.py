@@ -0,0 +1,393 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import argparse
+import csv
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from resource import getrusage, RUSAGE_SELF
+from numpy import asarray, percentile, resize, sort
+from numpy.random import default_rng
+
+import tensorflow as tf
+from tensorflow.keras.utils import to_categorical
+
+from . import __version__
+from . import neural_nets_keras
+from .data import augmod_source, rml2016_source, rml2018_source
+from .preprocessing import Preprocessor
+from .callbacks import StepProfiler
+from .utils import NETWORKS, DYNAMIC_NETWORKS, summarize_profile
+
+"""
+Performance benchmark of the networks of neural_nets_keras
+
+Usage:
+    python -m pythagore_modreco.bench --json results.json --csv results.csv
+"""
+
+# modules timed by benchmark_imports
+IMPORT_MODULES = [
+    "pythagore_modreco.data",
+    "pythagore_modreco.utils",
+    "pythagore_modreco.preprocessing",
+    "pythagore_modreco.numpy_engine",
+    "pythagore_modreco.neural_nets_keras",
+]
+
+SOURCES = {
+    "AugMod": augmod_source,
+    "RadioML2016": rml2016_source,
+    "RadioML2018": rml2018_source,
+}
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the current process in MB"""
+    return getrusage(RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def load_data(
+    dataset="synthetic",
+    data_path=None,
+    n_examples=4096,
+    signal_duration=128,
+    n_classes=10,
+    seed=0,
+):
+    """Load the signals used for benchmarking
+
+    Arguments:
+        dataset (str): "synthetic" or one of SOURCES
+        data_path (str): dataset path, unused for synthetic data
+        n_examples (int): number of signals
+        signal_duration (int): number of samples per signal
+        n_classes (int): number of classes of synthetic data
+        seed (int): random seed
+
+    Returns:
+        (tuple): signals (n, signal_duration, 2), class indices, number of classes
+    """
+    rng = default_rng(seed)
+    if dataset == "synthetic":
+        x = rng.standard_normal((n_examples, signal_duration, 2), dtype="float32")
+        y = rng.integers(n_classes, size=n_examples)
+        return x, y, n_classes
+
+    source = SOURCES[dataset](data_path)
+    n_examples = min(n_examples, len(source))
+    idx = sort(rng.choice(len(source), size=n_examples, replace=False))
+    x, y, _ = Preprocessor(signal_duration)(source, idx)
+    return x, y, source.n_classes
+
+
+def build_network(
+    name, signal_duration, n_classes, precision="float32", jit_compile=False
+):
+    """Build and compile a network as done in the notebook
+
+    Arguments:
+        name (str): network name, see NETWORKS
+        signal_duration (int): number of samples per signal
+        n_classes (int): number of classes
+        precision (str): precision policy, see neural_nets_keras.PRECISIONS
+        jit_compile (bool): compile with XLA
+
+    Returns:
+        (keras.Model): compiled model
+    """
+    input_shp = [None if name in DYNAMIC_NETWORKS else signal_duration, 2]
+    model = neural_nets_keras.get_model(name, input_shp, n_classes, precision)
+    return neural_nets_keras.compile_model(model, jit_compile=jit_compile)
+
+
+def benchmark_network(
+    name,
+    x,
+    y,
+    n_classes,
+    epochs=2,
+    batch_size=512,
+    batch_sizes=(1, 32, 256, 1024),
+    latency_runs=200,
+    precision="float32",
+    jit_compile=False,
+):
+    """Measure the training and inference performance of a network
+
+    Arguments:
+        name (str): network name, see NETWORKS
+        x (array): signals, shape (n, length, 2)
+        y (array): class indices
+        n_classes (int): number of classes
+        epochs (int): number of training epochs, the first one includes the
+            graph compilation
+        batch_size (int): training batch size
+        batch_sizes (list of int): inference batch sizes
+        latency_runs (int): number of single-signal predictions
+        precision (str): precision policy, see neural_nets_keras.PRECISIONS
+        jit_compile (bool): compile with XLA
+
+    Returns:
+        (dict): measurements
+    """
+    t = time.perf_counter()
+    model = build_network(name, x.shape[1], n_classes, precision, jit_compile)
+    result = {
+        "network": name,
+        "precision": precision,
+        "jit_compile": jit_compile,
+        "signal_duration": x.shape[1],
+        "n_examples": x.shape[0],
+        "parameters": model.count_params(),
+        "build_s": time.perf_counter() - t,
+    }
+
+    time_callback = StepProfiler(batch_size=batch_size)
+    train = tf.data.Dataset.from_tensor_slices((x, to_categorical(y, n_classes)))
+    model.fit(
+        time_callback.timed(
+            train.shuffle(x.shape[0]).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+        ),
+        epochs=epochs,
+        shuffle=False,
+        verbose=0,
+        callbacks=[time_callback],
+    )
+    times = time_callback.times
+    result["train_first_epoch_s"] = times[0]
+    steps = summarize_profile(time_callback.steps)
+    result["train_step_p50_ms"] = steps["step_p50_ms"]
+    result["train_step_p95_ms"] = steps["step_p95_ms"]
+    result["train_input_wait_fraction"] = steps["input_wait_fraction"]
+    result["train_s_per_epoch"] = (
+        sum(times[1:]) / len(times[1:]) if epochs > 1 else times[0]
+    )
+
+    for bs in batch_sizes:
+        xb = resize(x, (bs,) + x.shape[1:])
+        t = time.perf_counter()
+        model.predict_on_batch(xb)
+        result[f"warmup_bs{bs}_s"] = time.perf_counter() - t
+        n_runs = max(3, 4096 // bs)
+        t = time.perf_counter()
+        for _ in range(n_runs):
+            model.predict_on_batch(xb)
+        result[f"throughput_bs{bs}"] = n_runs * bs / (time.perf_counter() - t)
+
+    x1 = x[:1]
+    model.predict_on_batch(x1)
+    latencies = []
+    for _ in range(latency_runs):
+        t = time.perf_counter()
+        model.predict_on_batch(x1)
+        latencies.append(time.perf_counter() - t)
+    p50, p95, p99 = percentile(asarray(latencies) * 1000.0, [50, 95, 99])
+    result["latency_p50_ms"] = float(p50)
+    result["latency_p95_ms"] = float(p95)
+    result["latency_p99_ms"] = float(p99)
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+
+    return result
+
+
+def _run(args, name):
+    """Load the data and benchmark one network, used by the worker processes"""
+    x, y, n_classes = load_data(
+        args.dataset,
+        args.data_path,
+        args.n_examples,
+        args.signal_duration,
+        args.n_classes,
+        args.seed,
+    )
+    return benchmark_network(
+        name,
+        x,
+        y,
+        n_classes,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        batch_sizes=args.batch_sizes,
+        latency_runs=args.latency_runs,
+        precision=args.precision,
+        jit_compile=args.jit_compile,
+    )
+
+
+def benchmark_imports(modules=IMPORT_MODULES, repeats=3):
+    """Measure the import time of modules, each in a fresh interpreter
+
+    Arguments:
+        modules (list of str): modules to import
+        repeats (int): number of interpreters per module, the fastest is kept
+
+    Returns:
+        (list of dict): import time and whether TensorFlow got loaded
+    """
+    code = (
+        "import sys, time; t = time.perf_counter(); import {}; "
+        "print(time.perf_counter() - t, 'tensorflow' in sys.modules)"
+    )
+    results = []
+    for module in modules:
+        times = []
+        for _ in range(repeats):
+            out = subprocess.run(
+                [sys.executable, "-c", code.format(module)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            times.append(float(out[0]))
+        results.append(
+            {
+                "module": module,
+                "import_s": min(times),
+                "tensorflow_loaded": out[1] == "True",
+            }
+        )
+    return results
+
+
+def write_results(results, json_path=None, csv_path=None, metadata=None):
+    """Write benchmark results
+
+    Arguments:
+        results (list of dict): one measurement dict per network
+        json_path (str): path of the JSON output, skipped if None
+        csv_path (str): path of the CSV output, skipped if None
+        metadata (dict): run description, written in the JSON output
+    """
+    if json_path is not None:
+        with open(json_path, "w") as f:
+            json.dump({"metadata": metadata or {}, "results": results}, f, indent=2)
+
+    if csv_path is not None:
+        fields = []
+        for r in results:
+            fields += [k for k in r if k not in fields]
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m pythagore_modreco.bench",
+        description="Benchmark training and inference of the modulation recognition networks",
+    )
+    parser.add_argument("--networks", nargs="+", default=NETWORKS, choices=NETWORKS)
+    parser.add_argument(
+        "--dataset", default="synthetic", choices=["synthetic"] + list(SOURCES)
+    )
+    parser.add_argument("--data-path", default=None, help="dataset path")
+    parser.add_argument("--n-examples", type=int, default=4096)
+    parser.add_argument("--signal-duration", type=int, default=128)
+    parser.add_argument(
+        "--n-classes", type=int, default=10, help="number of synthetic classes"
+    )
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 1024]
+    )
+    parser.add_argument("--latency-runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--precision", default="float32", choices=neural_nets_keras.PRECISIONS
+    )
+    parser.add_argument(
+        "--jit-compile", action="store_true", help="compile the models with XLA"
+    )
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="run all networks in this process, peak RSS is then cumulative",
+    )
+    parser.add_argument(
+        "--imports",
+        action="store_true",
+        help="only measure the import time of the package modules",
+    )
+    parser.add_argument("--json", default=None, help="JSON output path")
+    parser.add_argument("--csv", default=None, help="CSV output path")
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    results = []
+    if args.imports:
+        results = benchmark_imports()
+        for result in results:
+            print(
+                f"{result['module']:40s}{result['import_s']:>8.3f} s"
+                f"{'  (loads tensorflow)' if result['tensorflow_loaded'] else ''}"
+            )
+    else:
+        for name in args.networks:
+            if args.no_isolate:
+                result = _run(args, name)
+            else:
+                # a fresh process per network, so that peak RSS is per network
+                with multiprocessing.get_context("spawn").Pool(1) as pool:
+                    result = pool.apply(_run, (args, name))
+            results.append(result)
+            print(
+                f"{name:20s}{result['train_s_per_epoch']:>10.2f} s/epoch"
+                f"{1000.0 / result[f'throughput_bs{args.batch_sizes[-1]}']:>10.3f} ms/signal"
+                f"{result['latency_p50_ms']:>10.2f} ms p50"
+                f"{result['parameters']:>12,d} params"
+                f"{result['peak_rss_mb']:>10.0f} MB"
+            )
+
+    metadata = {
+        "version": __version__,
+        "tensorflow": tf.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arguments": vars(args),
+    }
+    write_results(results, args.json, args.csv, metadata)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
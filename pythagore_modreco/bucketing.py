@@ -0,0 +1,228 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from time import perf_counter
+from numpy import arange, asarray, einsum, empty, quantile, searchsorted
+from numpy import sqrt, unique, zeros
+from numpy.random import default_rng
+
+"""
+Length-bucketed batching of signals of different durations for the networks
+accepting a dynamic signal length (Mod-LCNN, Mod-LRCNN): each batch only holds
+signals of one bucket and is zero-padded to the bucket length, which bounds
+both the padding and the number of distinct input shapes the model is traced
+for.
+"""
+
+
+def bucket_boundaries(lengths, n_buckets=8, multiple=16):
+    """Bucket lengths from the quantiles of the signal lengths
+
+    Arguments:
+        lengths (array of int): length of each signal
+        n_buckets (int): maximum number of buckets
+        multiple (int): bucket lengths are rounded up to a multiple of it
+
+    Returns:
+        (array of int): increasing bucket lengths, the last one holds the
+            longest signal
+    """
+    lengths = asarray(lengths)
+    q = quantile(lengths, arange(1, n_buckets + 1) / n_buckets, method="higher")
+    return unique(-(-q.astype("int64") // multiple) * multiple)
+
+
+def pad_batch(signals, idx, length, normalize=False):
+    """Zero-pad a selection of signals to a common length
+
+    Arguments:
+        signals (list of arrays): signals, shape (length_i, 2)
+        idx (array of int): indices of the signals of the batch
+        length (int): padded length, longer signals are truncated
+        normalize (bool): normalize the power of each signal over its samples
+
+    Returns:
+        (array): float32 batch, shape (len(idx), length, 2)
+    """
+    out = zeros((len(idx), length, 2), dtype="float32")
+    for j, i in enumerate(idx):
+        x = signals[i][:length]
+        out[j, : x.shape[0]] = x
+        if normalize and x.shape[0]:
+            out[j] /= sqrt(einsum("ij,ij->", out[j], out[j]) / (2 * x.shape[0]))
+    return out
+
+
+class BucketedBatcher:
+    """Batches of signals of different lengths grouped by length bucket
+
+    Arguments:
+        signals (list of arrays): signals, shape (length_i, 2)
+        labels (array of int): class indices. If None only signals are
+            yielded.
+        batch_size (int): maximum batch size
+        boundaries (array of int): bucket lengths, see bucket_boundaries. If
+            None they are computed with n_buckets buckets.
+        n_buckets (int): number of buckets when boundaries is None
+        shuffle (bool): shuffle the signals within their bucket and the order
+            of the batches at each iteration
+        normalize (bool): see pad_batch
+        seed (int): shuffling seed
+    """
+
+    def __init__(
+        self,
+        signals,
+        labels=None,
+        batch_size=256,
+        boundaries=None,
+        n_buckets=8,
+        shuffle=False,
+        normalize=False,
+        seed=None,
+    ):
+        self.signals = signals
+        self.labels = None if labels is None else asarray(labels)
+        self.batch_size = batch_size
+        self.lengths = asarray([x.shape[0] for x in signals], dtype="int64")
+        if boundaries is None:
+            boundaries = bucket_boundaries(self.lengths, n_buckets)
+        self.boundaries = asarray(boundaries, dtype="int64")
+        # signals longer than the last bucket are truncated to it
+        self.buckets = searchsorted(self.boundaries, self.lengths).clip(
+            0, self.boundaries.size - 1
+        )
+        self.shuffle = shuffle
+        self.normalize = normalize
+        self.rng = default_rng(seed)
+
+    def batches(self):
+        """Split the signals in batches of a single bucket
+
+        Returns:
+            (list of tuples): (indices, padded length) of each batch
+        """
+        batches = []
+        for b, length in enumerate(self.boundaries):
+            idx = (self.buckets == b).nonzero()[0]
+            if self.shuffle:
+                idx = self.rng.permutation(idx)
+            for i in range(0, idx.size, self.batch_size):
+                batches.append((idx[i : i + self.batch_size], int(length)))
+        if self.shuffle:
+            batches = [batches[i] for i in self.rng.permutation(len(batches))]
+        return batches
+
+    def __len__(self):
+        return sum(
+            -(-int((self.buckets == b).sum()) // self.batch_size)
+            for b in range(self.boundaries.size)
+        )
+
+    def __iter__(self):
+        for idx, length in self.batches():
+            x = pad_batch(self.signals, idx, length, self.normalize)
+            if self.labels is None:
+                yield x
+            else:
+                yield x, self.labels[idx]
+
+    def stats(self):
+        """Padding waste of the buckets against padding every signal to the
+        longest one
+
+        Returns:
+            (dict): number of signal samples, padded samples with buckets and
+                when padding to the max, the corresponding waste fractions and
+                the number of distinct batch shapes
+        """
+        kept = self.lengths.clip(0, self.boundaries[-1])
+        real = int(kept.sum())
+        bucketed = int(self.boundaries[self.buckets].sum())
+        padded_max = int(self.boundaries[-1]) * self.lengths.size
+        return {
+            "samples": real,
+            "bucketed_samples": bucketed,
+            "pad_to_max_samples": padded_max,
+            "bucketed_waste": 1 - real / max(bucketed, 1),
+            "pad_to_max_waste": 1 - real / max(padded_max, 1),
+            "n_shapes": int(unique(self.buckets).size),
+        }
+
+    def predict(self, model):
+        """Class probabilities of every signal, in the order of the signals
+
+        Arguments:
+            model: Keras model or any callable, predict_on_batch is used if
+                available
+
+        Returns:
+            (array): probabilities, shape (n, n_classes)
+        """
+        predict = getattr(model, "predict_on_batch", model)
+        out = None
+        for idx, length in self.batches():
+            p = asarray(predict(pad_batch(self.signals, idx, length, self.normalize)))
+            if out is None:
+                out = empty((len(self.signals), p.shape[1]), dtype="float32")
+            out[idx] = p
+        return out
+
+
+def compare_throughput(model, signals, batch_size=256, n_buckets=8, normalize=False):
+    """Inference throughput with length buckets and with padding to the max
+
+    Arguments:
+        model: see BucketedBatcher.predict
+        signals (list of arrays): signals, shape (length_i, 2)
+        batch_size (int): batch size
+        n_buckets (int): number of buckets
+        normalize (bool): see pad_batch
+
+    Returns:
+        (dict): BucketedBatcher.stats completed with "bucketed_signals_per_s" and
+            "pad_to_max_signals_per_s"
+    """
+    bucketed = BucketedBatcher(
+        signals, batch_size=batch_size, n_buckets=n_buckets, normalize=normalize
+    )
+    padded = BucketedBatcher(
+        signals,
+        batch_size=batch_size,
+        boundaries=bucketed.boundaries[-1:],
+        normalize=normalize,
+    )
+    stats = bucketed.stats()
+    for name, batcher in [("bucketed", bucketed), ("pad_to_max", padded)]:
+        # a first pass traces the model for every shape
+        batcher.predict(model)
+        t = perf_counter()
+        batcher.predict(model)
+        stats[f"{name}_signals_per_s"] = len(signals) / (perf_counter() - t)
+    return stats
@@ -0,0 +1,191 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import json
+import time
+from resource import getrusage, RUSAGE_SELF
+
+import tensorflow as tf
+from tensorflow.keras.callbacks import Callback
+
+
+class TimeHistory(Callback):
+    """Keras callback tto monitor execution time during training"""
+
+    def on_train_begin(self, logs={}):
+        self.times = []
+
+    def on_epoch_begin(self, epoch, logs={}):
+        self.epoch_time_start = time.time()
+
+    def on_epoch_end(self, epoch, logs={}):
+        self.times.append(time.time() - self.epoch_time_start)
+
+
+class StepProfiler(TimeHistory):
+    """Keras callback recording per-step training performance
+
+    On top of the epoch times of TimeHistory, records for every training step
+    its duration, the throughput and the peak RSS of the process, and, when
+    the training data goes through `timed`, the part of the step spent
+    waiting for the input pipeline. Optionally runs the TensorFlow profiler
+    over a window of steps.
+
+    Records are kept in `steps` and `epochs`, and written as JSON lines to
+    log_file if given, see utils.read_profile and utils.summarize_profile.
+
+    Args:
+        log_file (str, optional): path of the JSON lines log. Defaults to None.
+        batch_size (int, optional): batch size used to compute samples/s; the
+            last smaller batch of an epoch is counted as full. Defaults to None.
+        profile_steps (tuple of int, optional): (first, last) global steps
+            traced by the TensorFlow profiler. Defaults to None.
+        profile_dir (str, optional): TensorBoard log directory of the profiler.
+            Defaults to None.
+    """
+
+    def __init__(
+        self, log_file=None, batch_size=None, profile_steps=None, profile_dir=None
+    ):
+        super().__init__()
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.profile_steps = profile_steps
+        self.profile_dir = profile_dir
+        self._profiling = False
+        self._timed = False
+        self._waits = []
+
+    def timed(self, dataset):
+        """Wrap a tf.data.Dataset to measure the time spent waiting for it
+
+        Each element is fetched right after a timestamp is taken, and a last
+        synchronous stage records how long the consumer, i.e. the training
+        step, was blocked on it. The dataset must be given to fit as is, and
+        its own prefetch, if any, must come before this wrapping.
+
+        Args:
+            dataset (tf.data.Dataset): training data
+
+        Returns:
+            (tf.data.Dataset): same elements
+        """
+
+        def _stamp(_):
+            return tf.numpy_function(time.perf_counter, [], tf.float64)
+
+        def _record(t_request):
+            self._waits.append(time.perf_counter() - t_request)
+            return t_request
+
+        def _wait(t_request, element):
+            done = tf.numpy_function(_record, [t_request], tf.float64)
+            with tf.control_dependencies([done]):
+                return tf.nest.map_structure(tf.identity, element)
+
+        self._timed = True
+        stamps = tf.data.Dataset.range(1).repeat().map(_stamp)
+        return tf.data.Dataset.zip((stamps, dataset)).map(_wait)
+
+    def _log(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def on_train_begin(self, logs={}):
+        super().on_train_begin(logs)
+        self.steps = []
+        self.epochs = []
+        self._step = 0
+        self._file = open(self.log_file, "w") if self.log_file else None
+
+    def on_epoch_begin(self, epoch, logs={}):
+        super().on_epoch_begin(epoch, logs)
+        self._epoch = epoch
+        self._epoch_first_step = len(self.steps)
+
+    def on_train_batch_begin(self, batch, logs={}):
+        if self.profile_steps is not None and self._step == self.profile_steps[0]:
+            tf.profiler.experimental.start(self.profile_dir)
+            self._profiling = True
+        self._waits.clear()
+        self._t_begin = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs={}):
+        t = time.perf_counter()
+        step_time = t - self._t_begin
+        record = {
+            "type": "step",
+            "epoch": self._epoch,
+            "batch": batch,
+            "step": self._step,
+            "step_time": step_time,
+            "input_wait": sum(self._waits) if self._timed else None,
+            "samples_per_s": (
+                self.batch_size / step_time if self.batch_size and step_time else None
+            ),
+            "peak_rss_mb": getrusage(RUSAGE_SELF).ru_maxrss / 1024.0,
+        }
+        self.steps.append(record)
+        if self._file:
+            self._log(record)
+
+        if self._profiling and self._step == self.profile_steps[1]:
+            tf.profiler.experimental.stop()
+            self._profiling = False
+
+        self._step += 1
+
+    def on_epoch_end(self, epoch, logs={}):
+        super().on_epoch_end(epoch, logs)
+        steps = self.steps[self._epoch_first_step :]
+        step_time = sum(s["step_time"] for s in steps)
+        input_wait = sum(s["input_wait"] for s in steps) if self._timed else None
+        record = {
+            "type": "epoch",
+            "epoch": epoch,
+            "epoch_time": self.times[-1],
+            "n_steps": len(steps),
+            "step_time": step_time,
+            "input_wait": input_wait,
+            "input_wait_fraction": (
+                input_wait / max(step_time, 1e-12) if self._timed else None
+            ),
+            "peak_rss_mb": getrusage(RUSAGE_SELF).ru_maxrss / 1024.0,
+        }
+        self.epochs.append(record)
+        if self._file:
+            self._log(record)
+            self._file.flush()
+
+    def on_train_end(self, logs={}):
+        if self._profiling:
+            tf.profiler.experimental.stop()
+            self._profiling = False
+        if self._file:
+            self._file.close()
+            self._file = None
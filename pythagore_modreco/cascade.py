@@ -0,0 +1,233 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from time import perf_counter
+from numpy import arange, asarray, concatenate, cumsum, empty, flatnonzero, inf
+from numpy import unique, zeros
+
+"""
+Early-exit inference: a light network on a short prefix of the signals first,
+escalating the signals it is not confident about to longer prefixes and/or
+heavier networks
+"""
+
+
+class Cascade:
+    """Cascade of (model, prefix length) stages with confidence thresholds
+
+    A signal exits at the first stage whose highest class probability is at
+    least the stage threshold; the last stage classifies every remaining
+    signal. Models are called with predict_on_batch if available, and must
+    accept inputs of shape (n, length, 2), e.g. Mod-LCNN for any length.
+
+    Args:
+        stages (list of tuples): (model, length) of each stage, from the
+            cheapest to the most accurate. A length of None uses the whole
+            signal.
+        thresholds (list of float, optional): confidence threshold of each stage
+            but the last. If None they must be set by calibrate. Defaults to
+            None.
+        batch_size (int, optional): inference batch size. Defaults to 512.
+    """
+
+    def __init__(self, stages, thresholds=None, batch_size=512):
+        self.stages = list(stages)
+        self.thresholds = (
+            list(thresholds) if thresholds is not None else [inf] * (len(stages) - 1)
+        )
+        if len(self.thresholds) != len(self.stages) - 1:
+            raise ValueError("one threshold is needed per stage but the last")
+        self.batch_size = batch_size
+
+    def _stage_predict(self, k, x):
+        """Class probabilities of stage k, and its wall time"""
+        model, length = self.stages[k]
+        predict = getattr(model, "predict_on_batch", model)
+        x = x[:, :length]
+        t = perf_counter()
+        probs = [
+            asarray(predict(x[i : i + self.batch_size]))
+            for i in range(0, x.shape[0], self.batch_size)
+        ]
+        elapsed = perf_counter() - t
+        if not probs:
+            return empty((0, 0), dtype="float32"), elapsed
+        return concatenate(probs), elapsed
+
+    def predict(self, x, return_stages=False):
+        """Classify signals through the cascade
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            return_stages (bool, optional): also return the exit stage of each
+                signal. Defaults to False.
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes), and the exit
+                stages if return_stages
+        """
+        probs, stages, _ = self._run(x)
+        if return_stages:
+            return probs, stages
+        return probs
+
+    def _run(self, x):
+        """Run the cascade, returns probabilities, exit stages and the wall
+        time of each stage"""
+        n = x.shape[0]
+        probs = None
+        stages = zeros(n, dtype="int64")
+        times = zeros(len(self.stages))
+        active = arange(n)
+        for k in range(len(self.stages)):
+            if active.size == 0:
+                break
+            p, times[k] = self._stage_predict(k, x[active])
+            if probs is None:
+                probs = empty((n, p.shape[1]), dtype="float32")
+            last = k == len(self.stages) - 1
+            accept = (
+                slice(None)
+                if last
+                else flatnonzero(p.max(axis=1) >= self.thresholds[k])
+            )
+            probs[active[accept]] = p[accept]
+            stages[active[accept]] = k
+            if not last:
+                active = active[p.max(axis=1) < self.thresholds[k]]
+        return probs, stages, times
+
+    def calibrate(self, x, labels, target_accuracy=0.99):
+        """Set the thresholds on validation data
+
+        The threshold of each stage is the lowest confidence such that the
+        signals accepted by the stage, among those reaching it and including
+        all the signals of equal confidence, are classified with at least
+        target_accuracy. A stage that cannot reach it accepts nothing.
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            labels (array of int): class indices, shape (n,)
+            target_accuracy (float, optional): accuracy required from the early
+                exits. Defaults to 0.99.
+
+        Returns:
+            (list of float): thresholds
+        """
+        labels = asarray(labels)
+        active = arange(x.shape[0])
+        for k in range(len(self.stages) - 1):
+            if active.size == 0:
+                break
+            p, _ = self._stage_predict(k, x[active])
+            confidence = p.max(axis=1)
+            order = confidence.argsort()[::-1]
+            correct = p[order].argmax(axis=1) == labels[active][order]
+            accuracy = cumsum(correct) / arange(1, order.size + 1)
+            # a threshold accepts all the signals of equal confidence, so only
+            # the last signal of each group of ties is a possible cut
+            sorted_confidence = confidence[order]
+            ends = flatnonzero(
+                concatenate([sorted_confidence[1:] != sorted_confidence[:-1], [True]])
+            )
+            ok = ends[accuracy[ends] >= target_accuracy]
+            self.thresholds[k] = float(sorted_confidence[ok[-1]]) if ok.size else inf
+            active = active[confidence < self.thresholds[k]]
+        return self.thresholds
+
+    def evaluate(self, x, labels, snrs):
+        """Accuracy and latency per snr against the last stage alone on the
+        whole signals
+
+        The latency of a signal is estimated from the measured time per signal
+        of each stage it went through. Every stage and the baseline are run
+        once on a first batch before timing, as this traces the models.
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            labels (array of int): class indices, shape (n,)
+            snrs (array): snr of each signal, shape (n,)
+
+        Returns:
+            (dict): per-snr lists "snr", "accuracy", "baseline_accuracy",
+                "latency_ms", "baseline_latency_ms" and "exit_rate" (fraction
+                exiting at each stage), and the same overall under "overall"
+        """
+        labels = asarray(labels)
+        snrs = asarray(snrs).reshape(-1)
+        model, _ = self.stages[-1]
+        baseline = Cascade([(model, None)], batch_size=self.batch_size)
+        for cascade in [self, baseline]:
+            for k in range(len(cascade.stages)):
+                cascade._stage_predict(k, x[: self.batch_size])
+
+        probs, stages, times = self._run(x)
+        reached = [(stages >= k).sum() for k in range(len(self.stages))]
+        per_signal = [t / max(r, 1) for t, r in zip(times, reached)]
+        latency = cumsum(per_signal)[stages] * 1e3
+
+        base_probs, _, base_times = baseline._run(x)
+        base_latency = base_times[0] / max(x.shape[0], 1) * 1e3
+
+        correct = probs.argmax(axis=1) == labels
+        base_correct = base_probs.argmax(axis=1) == labels
+
+        def _summary(w):
+            return {
+                "accuracy": float(correct[w].mean()),
+                "baseline_accuracy": float(base_correct[w].mean()),
+                "latency_ms": float(latency[w].mean()),
+                "baseline_latency_ms": float(base_latency),
+                "exit_rate": [
+                    float((stages[w] == k).mean()) for k in range(len(self.stages))
+                ],
+            }
+
+        report = {k: [] for k in ["snr"] + list(_summary(slice(None)))}
+        for snr in unique(snrs):
+            row = _summary(snrs == snr)
+            report["snr"].append(float(snr))
+            for k, v in row.items():
+                report[k].append(v)
+        report["overall"] = _summary(slice(None))
+        return report
+
+
+def print_report(report):
+    """Print a report of Cascade.evaluate as a table"""
+    print(f"{'snr':>6} {'acc':>7} {'base acc':>9} {'lat ms':>8} {'base ms':>8}  exits")
+    rows = zip(*(report[k] for k in list(report)[:-1]))
+    overall = report["overall"]
+    for snr, acc, base_acc, lat, base_lat, exits in list(rows) + [
+        ("all",) + tuple(overall.values())
+    ]:
+        print(
+            f"{snr:>6} {acc:>7.3f} {base_acc:>9.3f} {lat:>8.4f} {base_lat:>8.4f}  "
+            + " ".join(f"{e:.2f}" for e in exits)
+        )
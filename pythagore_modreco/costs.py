@@ -0,0 +1,250 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import argparse
+from math import prod
+from numpy import dtype as np_dtype
+
+from .utils import NETWORKS
+
+"""
+Static cost of the networks: multiply-accumulates, activation memory and
+parameter bytes of every layer for a given signal length and batch size,
+computed from the layer shapes without running the networks
+
+Usage:
+    python -m pythagore_modreco.costs --lengths 128 1024 --batch-sizes 1 256
+"""
+
+
+# layer attributes holding the kernels applied at every output position, in
+# dense, convolution, depthwise and separable convolution layers
+KERNELS = ("kernel", "depthwise_kernel", "pointwise_kernel")
+
+
+def _itemsize(dtype):
+    """Size in bytes of a dtype given as a string or a tf.DType"""
+    return np_dtype(getattr(dtype, "name", dtype)).itemsize
+
+
+def _shape(tensors):
+    """Shape of the only tensor, or of the first one, of a layer input/output"""
+    if isinstance(tensors, (list, tuple)):
+        tensors = tensors[0]
+    return tuple(tensors.shape)
+
+
+def layer_costs(model, batch_size=1):
+    """Cost of every layer of a built network
+
+    MACs count the products of the kernels (the KERNELS attributes of
+    convolutions, separable and depthwise convolutions, dense layers): each
+    kernel is applied once per output position. Biases, activations,
+    normalizations and poolings are neglected.
+
+    Arguments:
+        model (keras.Model): network built for a fixed signal length
+        batch_size (int): number of signals per batch
+
+    Returns:
+        (list of dict): per layer "name", "type", "output_shape", "params",
+            "param_bytes", "macs" and "activation_bytes" (output of the layer
+            for the whole batch)
+    """
+    rows = []
+    for layer in model.layers:
+        if type(layer).__name__ == "InputLayer":
+            continue
+        out = _shape(layer.output)[1:]
+        if None in out:
+            raise ValueError(
+                f"layer {layer.name} has an unknown output shape {out}, build the "
+                "network for a fixed signal length"
+            )
+        positions = prod(out[:-1]) if len(out) > 1 else 1
+        macs = sum(
+            positions * prod(getattr(layer, attr).shape)
+            for attr in KERNELS
+            if getattr(layer, attr, None) is not None
+        )
+        rows.append(
+            {
+                "name": layer.name,
+                "type": type(layer).__name__,
+                "output_shape": out,
+                "params": sum(prod(w.shape) for w in layer.weights),
+                "param_bytes": sum(
+                    prod(w.shape) * _itemsize(w.dtype) for w in layer.weights
+                ),
+                "macs": macs * batch_size,
+                "activation_bytes": prod(out)
+                * batch_size
+                * _itemsize(layer.compute_dtype),
+            }
+        )
+    return rows
+
+
+def model_cost(model, batch_size=1):
+    """Total cost of a built network
+
+    Arguments:
+        model (keras.Model): network built for a fixed signal length
+        batch_size (int): number of signals per batch
+
+    Returns:
+        (dict): "params", "param_bytes", "macs", "activation_bytes" summed over
+            the layers and "peak_activation_bytes", the largest input plus
+            output of a single layer, a lower bound of the inference memory
+    """
+    rows = layer_costs(model, batch_size)
+    input_bytes = prod(_shape(model.inputs)[1:]) * batch_size * 4
+    peak, previous = 0, input_bytes
+    for row in rows:
+        peak = max(peak, previous + row["activation_bytes"])
+        previous = row["activation_bytes"]
+    total = {k: sum(r[k] for r in rows) for k in ("params", "param_bytes", "macs")}
+    total["activation_bytes"] = sum(r["activation_bytes"] for r in rows)
+    total["peak_activation_bytes"] = peak
+    return total
+
+
+def profile_networks(
+    networks=NETWORKS,
+    lengths=(128, 1024),
+    batch_sizes=(1,),
+    n_classes=8,
+    precision="float32",
+):
+    """Cost of several networks for several signal lengths and batch sizes
+
+    Arguments:
+        networks (list of str): networks of neural_nets_keras, see get_model
+        lengths (list of int): signal lengths
+        batch_sizes (list of int): batch sizes
+        n_classes (int): number of classes
+        precision (str): see neural_nets_keras.get_model
+
+    Returns:
+        (list of dict): model_cost of each combination, with "network",
+            "length" and "batch_size". Combinations a network cannot be built
+            for are skipped.
+    """
+    from .neural_nets_keras import get_model
+
+    rows = []
+    for name in networks:
+        for length in lengths:
+            try:
+                model = get_model(name, [length, 2], n_classes, precision=precision)
+            except ValueError:
+                # e.g. the poolings of RMLCNNVGG need at least 128 samples
+                continue
+            for batch_size in batch_sizes:
+                rows.append(
+                    dict(
+                        network=name,
+                        length=length,
+                        batch_size=batch_size,
+                        **model_cost(model, batch_size),
+                    )
+                )
+    return rows
+
+
+def print_table(rows, columns=None):
+    """Print cost rows as a table, MACs in millions and bytes in MiB"""
+    columns = columns or list(rows[0])
+    scales = {"macs": 1e6}
+    for c in columns:
+        if c.endswith("bytes"):
+            scales[c] = 2**20
+    header = [
+        c.replace("bytes", "MiB").replace("macs", "MMACs") if c in scales else c
+        for c in columns
+    ]
+    cells = [
+        [f"{row[c] / scales[c]:.3f}" if c in scales else str(row[c]) for c in columns]
+        for row in rows
+    ]
+    widths = [max(len(x) for x in col) for col in zip(header, *cells)]
+    for line in [header] + cells:
+        print(" ".join(f"{x:>{w}}" for x, w in zip(line, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pythagore_modreco.costs",
+        description="Static cost of the networks of neural_nets_keras",
+    )
+    parser.add_argument(
+        "--networks",
+        nargs="+",
+        default=NETWORKS,
+        help="networks of neural_nets_keras or presets of LMOD_PRESETS",
+    )
+    parser.add_argument("--lengths", type=int, nargs="+", default=[128, 1024])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1])
+    parser.add_argument("--n-classes", type=int, default=8)
+    parser.add_argument("--precision", default="float32")
+    parser.add_argument(
+        "--layers", action="store_true", help="also print the cost of every layer"
+    )
+    args = parser.parse_args(argv)
+
+    rows = profile_networks(
+        args.networks, args.lengths, args.batch_sizes, args.n_classes, args.precision
+    )
+    print_table(rows)
+
+    if args.layers:
+        from .neural_nets_keras import get_model
+
+        for name in args.networks:
+            for length in args.lengths:
+                try:
+                    model = get_model(name, [length, 2], args.n_classes, args.precision)
+                except ValueError:
+                    continue
+                print(f"\n{name}, length {length}, batch size {args.batch_sizes[0]}")
+                print_table(
+                    layer_costs(model, args.batch_sizes[0]),
+                    [
+                        "name",
+                        "type",
+                        "output_shape",
+                        "params",
+                        "macs",
+                        "activation_bytes",
+                    ],
+                )
+
+
+if __name__ == "__main__":
+    main()
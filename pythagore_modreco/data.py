@@ -27,8 +27,13 @@
 #
 # 2022 November 25
 
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+from os import makedirs, stat
+from os.path import basename, exists, join
 from h5py import File
-from numpy import array, zeros, sqrt, mean, vstack
+from numpy import array, sqrt, concatenate, repeat, einsum, save, load
+from numpy import asarray, empty, ones, diff, flatnonzero, isin, sort
 from numpy.random import choice
 import pickle
 
@@ -37,6 +42,140 @@ Gathers function to open different datasets of interest
 """
 
 
+AUGMOD_FIELDS = ("signals", "modulations", "snr", "frequency_offsets")
+
+
+def _block_rows(dset, batch_size):
+    """Number of rows to read at once so reads stay aligned on HDF5 chunks
+
+    Args:
+        dset (h5py.Dataset): dataset to read
+        batch_size (int): number of rows requested per batch
+
+    Returns:
+        (int): smallest multiple of the chunk row count covering batch_size
+    """
+    chunk_rows = dset.chunks[0] if dset.chunks is not None else 1
+    return chunk_rows * max(1, -(-batch_size // chunk_rows))
+
+
+def chunk_rows_for(row_nbytes, chunk_nbytes=2**20):
+    """Number of rows per HDF5 chunk for chunks of about chunk_nbytes
+
+    The default of 1 MiB is the size of the default h5py chunk cache, so that
+    a chunk being read or written stays in the cache.
+
+    Args:
+        row_nbytes (int): size of one row in bytes
+        chunk_nbytes (int, optional): target chunk size in bytes.
+            Defaults to 2**20.
+
+    Returns:
+        (int): number of rows per chunk, at least 1
+    """
+    return max(1, chunk_nbytes // row_nbytes)
+
+
+class AugModDataset:
+    """Lazy access to an Augmod dataset file
+
+    The file is kept open and `signals`, `modulations`, `snr` and
+    `frequency_offsets` are exposed as h5py datasets: slicing them only
+    reads the requested rows from disk.
+
+    Args:
+        fname (string): dataset path
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._file = File(fname, "r")
+        self.classes = [c.decode() for c in self._file["classes"]]
+        self.signals = self._file["signals"]
+        self.modulations = self._file["modulations"]
+        self.snr = self._file["snr"]
+        self.frequency_offsets = self._file["frequency_offsets"]
+
+    def __len__(self):
+        return self.signals.shape[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the underlying file"""
+        self._file.close()
+
+    def iter_batches(self, batch_size, start=0, stop=None, fields=AUGMOD_FIELDS):
+        """Iterate over consecutive batches of the dataset
+
+        Rows are read from disk in blocks aligned on the HDF5 chunks of the
+        signals, so that only one block is held in memory at a time.
+
+        Args:
+            batch_size (int): number of signals per batch
+            start (int, optional): first row. Defaults to 0.
+            stop (int, optional): last row (excluded). If None goes to the end.
+                Defaults to None.
+            fields (tuple of str, optional): fields to read.
+                Defaults to AUGMOD_FIELDS.
+
+        Yields:
+            (dict): arrays of at most batch_size rows for each field
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        block = _block_rows(self.signals, batch_size)
+        cache, cache_start, cache_stop = None, 0, 0
+
+        for i0 in range(start, stop, batch_size):
+            i1 = min(i0 + batch_size, stop)
+            parts = []
+            i = i0
+            while i < i1:
+                if not cache_start <= i < cache_stop:
+                    cache_start = max(start, (i // block) * block)
+                    cache_stop = min((i // block + 1) * block, stop)
+                    cache = {k: self._file[k][cache_start:cache_stop] for k in fields}
+                j = min(i1, cache_stop)
+                parts.append(
+                    {k: v[i - cache_start : j - cache_start] for k, v in cache.items()}
+                )
+                i = j
+            if len(parts) == 1:
+                yield parts[0]
+            else:
+                yield {k: concatenate([p[k] for p in parts]) for k in fields}
+
+    def read(self, idx, fields=AUGMOD_FIELDS, n_threads=1):
+        """Read a selection of rows, see `read_rows`
+
+        Args:
+            idx (array of int): sorted, unique indices of the rows to read
+            fields (tuple of str, optional): fields to read.
+                Defaults to AUGMOD_FIELDS.
+            n_threads (int, optional): number of reading threads. Defaults to 1.
+
+        Returns:
+            (dict): selected rows for each field
+        """
+        return {k: read_rows(self._file[k], idx, n_threads=n_threads) for k in fields}
+
+    def load(self):
+        """Read the whole dataset in memory
+
+        Returns:
+            (dict): loaded dataset
+        """
+        data = dict()
+        data["classes"] = list(self.classes)
+        for k in AUGMOD_FIELDS:
+            data[k] = array(self._file[k])
+        return data
+
+
 def read_augmod(fname):
     """Open Augmod dataset
 
@@ -46,50 +185,67 @@ def read_augmod(fname):
     Returns:
         (dict): loaded dataset
     """
-    data = dict()
-    with File(fname, "r") as f:
-        data["classes"] = [c.decode() for c in f["classes"]]
-        data["signals"] = array(f["signals"])
-        data["modulations"] = array(f["modulations"])
-        data["snr"] = array(f["snr"])
-        data["frequency_offsets"] = array(f["frequency_offsets"])
+    with AugModDataset(fname) as dataset:
+        data = dataset.load()
     return data
 
 
-def read_RML2016(fname="./2016.04C.multisnr.pkl", snrs=None, verbose=False):
+def _rml2016_cache_prefix(cache_dir, fname, snrs):
+    """Path prefix of the cached arrays of a RML2016 conversion
+
+    The prefix depends on the source file name, size and modification time
+    and on the selected snrs, in the given order as it is the order of the
+    rows, so that a stale cache is never reused.
+
+    Args:
+        cache_dir (str): cache directory
+        fname (str): RML2016 pickle path
+        snrs (list of int): list of snrs to keep. If None keeps all.
+
+    Returns:
+        (str): path prefix of the cached files
+    """
+    st = stat(fname)
+    key = repr((st.st_size, st.st_mtime_ns, None if snrs is None else list(snrs)))
+    digest = md5(key.encode()).hexdigest()[:16]
+    return join(cache_dir, f"{basename(fname)}-{digest}")
+
+
+def read_RML2016(
+    fname="./2016.04C.multisnr.pkl", snrs=None, verbose=False, cache_dir=None
+):
     """Open datasets from Radio Machine Learning 2016
 
     Args:
         fname (str, optional): [description]. Defaults to './2016.04C.multisnr.pkl'.
         snrs (list of int, optional): list of snrs to keep. If None keeps all.  Defaults to None.
         verbose (bool): set verbosity
+        cache_dir (str, optional): if set, the converted arrays are saved in this
+            directory as .npy files the first time, and memory-mapped from there
+            on the next calls. Defaults to None.
 
     Returns:
         (tuple of arrays): data, labels, snrs, list of possible modulations
     """
 
-    def _create_data_set(snrs_):
-
-        X = []
-        lbl = []
-        snrX = []
-
-        for mod in mods:
-            for snr in snrs_:
-                sigs = Xd[(mod, snr)]
-                tmp_sigs = zeros((sigs.shape[0], sigs.shape[1] * sigs.shape[2]))
-                tmp_sigs[:, : sigs.shape[2]] = sigs[:, 0, :]
-                tmp_sigs[:, sigs.shape[2] :] = sigs[:, 1, :]
-                norm = sqrt(mean(tmp_sigs**2, axis=1))
-                X.append(Xd[(mod, snr)] / norm[:, None, None])
-                for i in range(Xd[(mod, snr)].shape[0]):
-                    lbl.append(mod)
-                    snrX.append(snr)
-        X = vstack(X)
-        snrX = array(snrX)
-        return array(X), array(lbl), array(snrX)
-
-    Xd = pickle.load(open(fname, "rb"), encoding="latin1")
+    if cache_dir is not None:
+        prefix = _rml2016_cache_prefix(cache_dir, fname, snrs)
+        if exists(prefix + "-mods.txt"):
+            x = load(prefix + "-x.npy", mmap_mode="r")
+            lab = load(prefix + "-labels.npy")
+            s = load(prefix + "-snrs.npy")
+            with open(prefix + "-mods.txt") as f:
+                mods = f.read().splitlines()
+            if verbose:
+                print(f"Loaded from cache {prefix}")
+                print("List of signal SNR:")
+                print(sorted(set(s.tolist())))
+                print("List of modulations under consideration:")
+                print(mods)
+            return x, lab, s, mods
+
+    with open(fname, "rb") as f:
+        Xd = pickle.load(f, encoding="latin1")
     # Xd: dictionnary with
     # keys = (str: modulation_name , int: snr) and
     # values = tensor of signals which shape is (nb_of_signals, 2 , 128)
@@ -107,37 +263,265 @@ def read_RML2016(fname="./2016.04C.multisnr.pkl", snrs=None, verbose=False):
         print("List of modulations under consideration:")
         print(mods)
 
-    x, lab, s = _create_data_set(snrs)
-    lab = array([mods.index(l) for l in lab])
+    keys = [(mod, snr) for mod in mods for snr in snrs]
+    counts = [Xd[k].shape[0] for k in keys]
+    x = concatenate([Xd[k] for k in keys])
+    del Xd
+    lab = repeat([mods.index(mod) for mod, _ in keys], counts)
+    s = repeat([snr for _, snr in keys], counts)
+
+    # normalize the power of each signal, accumulating in float64
+    norm = einsum("ijk,ijk->i", x, x, dtype="float64") / (x.shape[1] * x.shape[2])
+    x /= sqrt(norm).astype(x.dtype)[:, None, None]
+
+    if cache_dir is not None:
+        makedirs(cache_dir, exist_ok=True)
+        save(prefix + "-x.npy", x)
+        save(prefix + "-labels.npy", lab)
+        save(prefix + "-snrs.npy", s)
+        # written last: marks the cache as complete
+        with open(prefix + "-mods.txt", "w") as f:
+            f.write("\n".join(mods))
 
     return x, lab, s, mods
 
 
-def read_RML2018(fName, nb_examples=None):
+def read_rows(dset, idx, n_threads=1, max_gap=None, block_rows=4096):
+    """Read a selection of rows of an h5py dataset
+
+    The sorted indices are coalesced into contiguous runs, each run is read
+    with a single slice and only the selected rows are kept. Indices closer
+    than max_gap are merged in the same run, and runs never cross a multiple
+    of block_rows so that temporary buffers stay small.
+
+    Args:
+        dset (h5py.Dataset or array): dataset to read
+        idx (array of int): sorted, unique indices of the rows to read
+        n_threads (int, optional): number of threads reading runs concurrently.
+            Defaults to 1.
+        max_gap (int, optional): largest number of unselected rows read in a
+            run. If None uses the HDF5 chunk row count. Defaults to None.
+        block_rows (int, optional): maximum run length. Defaults to 4096.
+
+    Returns:
+        (array): selected rows, in the order of idx
+    """
+    idx = asarray(idx, dtype="int64")
+    if (diff(idx) < 0).any():
+        raise ValueError("read_rows expects sorted indices")
+    out = empty((idx.size,) + dset.shape[1:], dtype=dset.dtype)
+    if idx.size == 0:
+        return out
+
+    if max_gap is None:
+        chunks = getattr(dset, "chunks", None)
+        max_gap = chunks[0] if chunks is not None else 0
+    breaks = flatnonzero((diff(idx) > max_gap + 1) | (diff(idx // block_rows) != 0)) + 1
+    starts = concatenate([[0], breaks])
+    stops = concatenate([breaks, [idx.size]])
+
+    def _read_run(run):
+        i0, i1 = run
+        a, b = idx[i0], idx[i1 - 1] + 1
+        out[i0:i1] = dset[a:b][idx[i0:i1] - a]
+
+    runs = zip(starts, stops)
+    if n_threads > 1:
+        with ThreadPoolExecutor(n_threads) as executor:
+            list(executor.map(_read_run, runs))
+    else:
+        for run in runs:
+            _read_run(run)
+
+    return out
+
+
+def read_RML2018(
+    fName, nb_examples=None, snr_cut=None, snrs=None, mods=None, n_threads=1
+):
     """Open datasets from Radio Machine Learning 2018
 
+    Rows are filtered on SNR and modulation before reading the signals, and
+    only the selected rows are read from disk. When a selection is applied
+    the rows are returned sorted by their index in the file.
+
     Args:
-        fname (str, optional): [description]. Defaults to './2016.04C.multisnr.pkl'.
-        snrs (list of int, optional): list of snrs to keep. If None keeps all.  Defaults to None.
-        verbose (bool): set verbosity
+        fName (str): dataset path
+        nb_examples (int, optional): number of examples randomly drawn among the
+            selected rows. If None keeps all. Defaults to None.
+        snr_cut (float, optional): keep signals with snr>=snr_cut. If None keeps
+            all. Defaults to None.
+        snrs (list of int, optional): list of snrs to keep. If None keeps all.
+            Defaults to None.
+        mods (list of int, optional): list of modulation indices to keep. If None
+            keeps all. Defaults to None.
+        n_threads (int, optional): number of threads reading the file.
+            Defaults to 1.
 
     Returns:
         (tuple of arrays): data, labels, snrs, None
     """
     with File(fName, "r") as h:
 
-        if not nb_examples is None:
-            w = choice(h["X"].shape[0], size=nb_examples, replace=False)
-            data = h["X"][:][w]
-            mods_ = h["Y"][:][w]
-            snrs_ = h["Z"][:][w]
-        else:
+        if nb_examples is None and snr_cut is None and snrs is None and mods is None:
             data = h["X"][:]
             mods_ = h["Y"][:]
             snrs_ = h["Z"][:]
+        else:
+            keep = ones(h["X"].shape[0], dtype=bool)
+            if snr_cut is not None or snrs is not None:
+                z = h["Z"][:].reshape(-1)
+                if snr_cut is not None:
+                    keep &= z >= snr_cut
+                if snrs is not None:
+                    keep &= isin(z, snrs)
+            if mods is not None:
+                keep &= h["Y"][:, sorted(mods)].any(axis=1)
+            w = flatnonzero(keep)
+
+            if nb_examples is not None:
+                w = sort(choice(w, size=nb_examples, replace=False))
+
+            data = read_rows(h["X"], w, n_threads=n_threads)
+            mods_ = read_rows(h["Y"], w, n_threads=n_threads)
+            snrs_ = read_rows(h["Z"], w, n_threads=n_threads)
 
     snrs_ = snrs_.flatten()
     snrs_ = snrs_.reshape(-1)
     data = data.transpose((0, 2, 1))
 
     return data, mods_, snrs_, None
+
+
+class SignalSource:
+    """Signals, labels and snrs of a dataset read by selections of rows
+
+    Gives the same interface to the three datasets whether they are kept on
+    disk (h5py datasets), memory-mapped or in memory. Signals are returned as
+    stored, see channels_last.
+
+    Args:
+        signals (array-like): signals, shape (n, 2, length) or (n, length, 2)
+        labels (array-like): class index, or one-hot vector, of each signal
+        snrs (array-like): snr of each signal
+        classes (list of str or int): class names, or number of classes
+        channels_last (bool, optional): signals are stored as (n, length, 2).
+            Defaults to False.
+        owner (object, optional): object to keep alive while the source is used,
+            e.g. the open file. Defaults to None.
+    """
+
+    def __init__(self, signals, labels, snrs, classes, channels_last=False, owner=None):
+        self.signals = signals
+        self.labels = labels
+        self.snrs = snrs
+        self.classes = classes
+        self.n_classes = classes if isinstance(classes, int) else len(classes)
+        self.channels_last = channels_last
+        self._owner = owner
+
+    def __len__(self):
+        return self.signals.shape[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the owner, e.g. the open file, if it can be closed"""
+        close = getattr(self._owner, "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def signal_length(self):
+        """Number of samples per signal"""
+        return self.signals.shape[1 if self.channels_last else 2]
+
+    def snr_values(self):
+        """Read the snr of every signal
+
+        Returns:
+            (array): snrs, shape (n,)
+        """
+        return asarray(self.snrs[:]).reshape(-1)
+
+    def label_values(self):
+        """Read the class index of every signal
+
+        Returns:
+            (array of int): class indices, shape (n,)
+        """
+        labels = asarray(self.labels[:])
+        return labels.argmax(axis=1) if labels.ndim == 2 else labels
+
+    def read(self, idx, n_threads=1):
+        """Read a selection of rows
+
+        Args:
+            idx (array of int): sorted, unique indices of the rows to read
+            n_threads (int, optional): number of reading threads. Defaults to 1.
+
+        Returns:
+            (tuple of arrays): signals, class indices, snrs
+        """
+        signals = read_rows(self.signals, idx, n_threads=n_threads)
+        labels = read_rows(self.labels, idx, n_threads=n_threads)
+        if labels.ndim == 2:
+            labels = labels.argmax(axis=1)
+        snrs = read_rows(self.snrs, idx, n_threads=n_threads).reshape(-1)
+        return signals, labels, snrs
+
+
+def augmod_source(fname):
+    """Open Augmod dataset as a SignalSource, signals stay on disk
+
+    Args:
+        fname (string): dataset path
+
+    Returns:
+        (SignalSource): dataset source
+    """
+    dataset = AugModDataset(fname)
+    return SignalSource(
+        dataset.signals,
+        dataset.modulations,
+        dataset.snr,
+        dataset.classes,
+        owner=dataset,
+    )
+
+
+def rml2016_source(fname, snrs=None, cache_dir=None):
+    """Open a Radio Machine Learning 2016 dataset as a SignalSource
+
+    Args:
+        fname (str): dataset path
+        snrs (list of int, optional): list of snrs to keep. If None keeps all.
+            Defaults to None.
+        cache_dir (str, optional): see read_RML2016. With a cache the signals are
+            memory-mapped. Defaults to None.
+
+    Returns:
+        (SignalSource): dataset source
+    """
+    x, lab, s, mods = read_RML2016(fname, snrs=snrs, cache_dir=cache_dir)
+    return SignalSource(x, lab, s, mods)
+
+
+def rml2018_source(fName):
+    """Open Radio Machine Learning 2018 dataset as a SignalSource, signals
+    stay on disk
+
+    Args:
+        fName (str): dataset path
+
+    Returns:
+        (SignalSource): dataset source
+    """
+    h = File(fName, "r")
+    return SignalSource(
+        h["X"], h["Y"], h["Z"], h["Y"].shape[1], channels_last=True, owner=h
+    )
@@ -0,0 +1,259 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from os import replace
+from os.path import exists
+from time import perf_counter
+from numpy import asarray, concatenate, empty, eye, load, unique
+from numpy.lib.format import open_memmap
+
+import tensorflow as tf
+from tensorflow.keras.layers import Input, Layer
+from tensorflow.keras.models import Model
+
+"""
+Knowledge distillation of a trained heavy network (get_RMLResNet,
+get_RMLCNNVGG) into a light one (get_LModCNN, get_LModCNNResNetRelu) with
+temperature-softened teacher logits, and comparison of the resulting networks
+"""
+
+
+class _Logits(Layer):
+    """Pre-softmax output of a Dense layer, sharing its weights"""
+
+    def __init__(self, dense, **kwargs):
+        super().__init__(dtype="float32", **kwargs)
+        self.dense = dense
+
+    def call(self, h):
+        return tf.matmul(tf.cast(h, "float32"), self.dense.kernel) + self.dense.bias
+
+
+def logits_model(model):
+    """Model computing the logits of a network ending with a softmax Dense
+    layer, as all the networks of neural_nets_keras
+
+    Arguments:
+        model (keras.Model): network
+
+    Returns:
+        (keras.Model): model sharing the weights of the network, whose outputs
+            are the inputs of the final softmax
+    """
+    features = Model(model.inputs, model.layers[-1].input)
+    x = Input(shape=model.input_shape[1:])
+    return Model(x, _Logits(model.layers[-1])(features(x)))
+
+
+def teacher_logits(teacher, x, batch_size=512, cache=None):
+    """Logits of the teacher, optionally cached on disk
+
+    Arguments:
+        teacher (keras.Model): trained network
+        x (array): signals, shape (n, length, 2)
+        batch_size (int): inference batch size
+        cache (str): path of a .npy file. If it exists the logits are
+            memory-mapped from it, otherwise they are written to it.
+
+    Returns:
+        (array): float32 logits, shape (n, n_classes)
+    """
+    if cache is not None and exists(cache):
+        logits = load(cache, mmap_mode="r")
+        if logits.shape[0] != x.shape[0]:
+            raise ValueError(f"{cache} holds logits of {logits.shape[0]} signals")
+        return logits
+
+    model = logits_model(teacher)
+    shape = (x.shape[0], teacher.output_shape[-1])
+    if cache is None:
+        logits = empty(shape, dtype="float32")
+    else:
+        logits = open_memmap(cache + ".tmp", mode="w+", dtype="float32", shape=shape)
+    for i in range(0, x.shape[0], batch_size):
+        logits[i : i + batch_size] = asarray(
+            model.predict_on_batch(x[i : i + batch_size])
+        )
+
+    if cache is not None:
+        # rename last so that an interrupted run leaves no cache
+        logits.flush()
+        del logits
+        replace(cache + ".tmp", cache)
+        logits = load(cache, mmap_mode="r")
+    return logits
+
+
+def distillation_loss(n_classes, temperature=4.0, alpha=0.1):
+    """Loss of the student logits against targets made of the one-hot labels
+    followed by the teacher logits
+
+    Arguments:
+        n_classes (int): number of classes
+        temperature (float): softmax temperature of the soft targets
+        alpha (float): weight of the hard label loss, the soft target loss is
+            weighted by 1 - alpha
+
+    Returns:
+        (callable): Keras loss
+    """
+
+    def loss(y, z):
+        labels, t = y[:, :n_classes], y[:, n_classes:]
+        hard = tf.keras.losses.categorical_crossentropy(labels, z, from_logits=True)
+        log_p = tf.nn.log_softmax(t / temperature)
+        log_q = tf.nn.log_softmax(z / temperature)
+        soft = tf.reduce_sum(tf.exp(log_p) * (log_p - log_q), axis=-1)
+        # temperature**2 keeps the soft gradients on the scale of the hard ones
+        return alpha * hard + (1 - alpha) * temperature**2 * soft
+
+    return loss
+
+
+def distill(
+    student,
+    x,
+    labels,
+    logits,
+    temperature=4.0,
+    alpha=0.1,
+    epochs=10,
+    batch_size=512,
+    validation_data=None,
+    callbacks=None,
+    optimizer="adam",
+):
+    """Train a student network on the soft targets of a teacher
+
+    The student is trained in place and keeps its softmax output.
+
+    Arguments:
+        student (keras.Model): network to train, ending with a softmax Dense
+            layer
+        x (array): training signals, shape (n, length, 2)
+        labels (array of int): class indices, shape (n,)
+        logits (array): teacher logits of x, see teacher_logits
+        temperature (float): softmax temperature of the soft targets
+        alpha (float): weight of the hard label loss
+        epochs (int): number of epochs
+        batch_size (int): batch size
+        validation_data (tuple): (signals, class indices, teacher logits)
+            evaluated at the end of each epoch
+        callbacks (list): Keras callbacks
+        optimizer (str or keras.optimizers.Optimizer): optimizer
+
+    Returns:
+        (keras.callbacks.History): training history
+    """
+    n_classes = logits.shape[1]
+
+    def accuracy(y, z):
+        return tf.keras.metrics.categorical_accuracy(y[:, :n_classes], z)
+
+    model = logits_model(student)
+    model.compile(
+        loss=distillation_loss(n_classes, temperature, alpha),
+        optimizer=optimizer,
+        metrics=[accuracy],
+    )
+
+    def targets(y, t):
+        return concatenate([eye(n_classes, dtype="float32")[y], t], axis=1)
+
+    if validation_data is not None:
+        x_valid, y_valid, t_valid = validation_data
+        validation_data = (x_valid, targets(asarray(y_valid), asarray(t_valid)))
+
+    return model.fit(
+        x,
+        targets(asarray(labels), asarray(logits)),
+        epochs=epochs,
+        batch_size=batch_size,
+        validation_data=validation_data,
+        callbacks=callbacks,
+    )
+
+
+def compare_models(models, x, labels, snrs, batch_size=512):
+    """Accuracy per snr, inference cost and size of several networks
+
+    Arguments:
+        models (dict): networks by name, e.g. teacher, distilled student and
+            student trained on the labels only
+        x (array): test signals, shape (n, length, 2)
+        labels (array of int): class indices, shape (n,)
+        snrs (array): snr of each signal, shape (n,)
+        batch_size (int): inference batch size
+
+    Returns:
+        (dict): for each name, "params", "ms_per_signal", "accuracy" and
+            "accuracy_per_snr" (list aligned on "snr")
+    """
+    labels = asarray(labels)
+    snrs = asarray(snrs).reshape(-1)
+    snr_values = unique(snrs)
+    report = {"snr": [float(s) for s in snr_values]}
+    for name, model in models.items():
+        # first batch outside the timing, it traces the model
+        model.predict_on_batch(x[:batch_size])
+        t = perf_counter()
+        probs = concatenate(
+            [
+                asarray(model.predict_on_batch(x[i : i + batch_size]))
+                for i in range(0, x.shape[0], batch_size)
+            ]
+        )
+        elapsed = perf_counter() - t
+        correct = probs.argmax(axis=1) == labels
+        report[name] = {
+            "params": int(model.count_params()),
+            "ms_per_signal": elapsed / x.shape[0] * 1e3,
+            "accuracy": float(correct.mean()),
+            "accuracy_per_snr": [float(correct[snrs == s].mean()) for s in snr_values],
+        }
+    return report
+
+
+def print_comparison(report):
+    """Print a report of compare_models as a table"""
+    names = [k for k in report if k != "snr"]
+    print(f"{'':>14}" + "".join(f"{n:>20}" for n in names))
+    print(f"{'params':>14}" + "".join(f"{report[n]['params']:>20}" for n in names))
+    print(
+        f"{'ms/signal':>14}"
+        + "".join(f"{report[n]['ms_per_signal']:>20.4f}" for n in names)
+    )
+    print(
+        f"{'accuracy':>14}" + "".join(f"{report[n]['accuracy']:>20.3f}" for n in names)
+    )
+    for i, snr in enumerate(report["snr"]):
+        print(
+            f"{'snr ' + str(snr):>14}"
+            + "".join(f"{report[n]['accuracy_per_snr'][i]:>20.3f}" for n in names)
+        )
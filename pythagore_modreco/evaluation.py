@@ -0,0 +1,220 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from numpy import arange, asarray, bincount, clip, errstate, linspace, searchsorted
+from numpy import sort, unique, zeros
+
+from .data import read_rows
+from .preprocessing import Preprocessor
+
+"""
+Single-pass evaluation of one or several networks over a dataset source:
+per-snr accuracy, confusion matrices and per-frequency-offset accuracy are
+accumulated batch by batch with bincount, without keeping the predictions
+"""
+
+
+class Evaluator:
+    """Accumulate confusion matrices per snr and accuracy per frequency offset
+
+    Args:
+        n_classes (int): number of classes
+        snrs (array): sorted snr values of the dataset
+        frequency_offset_bins (array, optional): edges of the frequency offset
+            bins. If None frequency offsets are not accumulated. Defaults to
+            None.
+    """
+
+    def __init__(self, n_classes, snrs, frequency_offset_bins=None):
+        self.n_classes = n_classes
+        self.snrs = asarray(snrs)
+        self.frequency_offset_bins = frequency_offset_bins
+        self.confusion = zeros(self.snrs.size * n_classes**2, dtype="int64")
+        if frequency_offset_bins is not None:
+            n_bins = len(frequency_offset_bins) - 1
+            self.fo_total = zeros(n_bins, dtype="int64")
+            self.fo_correct = zeros(n_bins, dtype="int64")
+
+    def update(self, predictions, labels, snrs, frequency_offsets=None):
+        """Add a batch
+
+        Args:
+            predictions (array): class probabilities, shape (n, n_classes), or
+                predicted class indices, shape (n,)
+            labels (array of int): class indices, shape (n,)
+            snrs (array): snr of each signal, shape (n,)
+            frequency_offsets (array, optional): frequency offset of each
+                signal, shape (n,). Defaults to None.
+        """
+        predictions = asarray(predictions)
+        if predictions.ndim == 2:
+            predictions = predictions.argmax(axis=1)
+        labels = asarray(labels)
+        c = self.n_classes
+        s = searchsorted(self.snrs, asarray(snrs).reshape(-1))
+        self.confusion += bincount(
+            (s * c + labels) * c + predictions, minlength=self.confusion.size
+        )
+        if self.frequency_offset_bins is not None and frequency_offsets is not None:
+            b = clip(
+                searchsorted(self.frequency_offset_bins, frequency_offsets, "right")
+                - 1,
+                0,
+                self.fo_total.size - 1,
+            )
+            self.fo_total += bincount(b, minlength=self.fo_total.size)
+            self.fo_correct += bincount(
+                b, weights=predictions == labels, minlength=self.fo_total.size
+            ).astype("int64")
+
+    def result(self):
+        """Metrics accumulated so far
+
+        Returns:
+            (dict): "accuracy", "snr", "accuracy_per_snr", "confusion"
+                (true class x predicted class), "confusion_per_snr", and when
+                frequency offsets are accumulated "frequency_offset_bins" and
+                "accuracy_per_frequency_offset"
+        """
+        c = self.n_classes
+        per_snr = self.confusion.reshape(-1, c, c)
+        confusion = per_snr.sum(axis=0)
+        with errstate(invalid="ignore", divide="ignore"):
+            out = {
+                "accuracy": confusion.trace() / confusion.sum(),
+                "snr": self.snrs,
+                "accuracy_per_snr": per_snr.trace(axis1=1, axis2=2)
+                / per_snr.sum(axis=(1, 2)),
+                "confusion": confusion,
+                "confusion_per_snr": per_snr,
+            }
+            if self.frequency_offset_bins is not None:
+                out["frequency_offset_bins"] = asarray(self.frequency_offset_bins)
+                out["accuracy_per_frequency_offset"] = self.fo_correct / self.fo_total
+        return out
+
+
+def _load(model):
+    """Load a model saved by model.save, or return it"""
+    if isinstance(model, str):
+        from tensorflow.keras.models import load_model
+
+        model = load_model(model, compile=False)
+    return getattr(model, "predict_on_batch", model)
+
+
+def evaluate(
+    models,
+    source,
+    indices=None,
+    batch_size=512,
+    signal_duration=None,
+    snr_cut=None,
+    normalize=True,
+    frequency_offsets=None,
+    n_frequency_offset_bins=10,
+):
+    """Evaluate several networks over the same batches of a source in one pass
+
+    Each batch is read and preprocessed once, as in tf_data.make_dataset, then
+    given to every network.
+
+    Args:
+        models (dict): networks by name, Keras models, callables, or paths of
+            models saved by model.save
+        source (data.SignalSource): dataset source
+        indices (array of int, optional): rows to evaluate, e.g. the test
+            indices of utils.split_indices. If None uses all rows. Defaults to
+            None.
+        batch_size (int, optional): batch size. Defaults to 512.
+        signal_duration (int, optional): number of samples to keep. If None keeps
+            all. Defaults to None.
+        snr_cut (float, optional): keep signals with snr>=snr_cut. If None keeps
+            all. Defaults to None.
+        normalize (bool, optional): normalize the power of each signal.
+            Defaults to True.
+        frequency_offsets (array-like, optional): frequency offset of every row
+            of the source, e.g. AugModDataset.frequency_offsets. Defaults to
+            None.
+        n_frequency_offset_bins (int, optional): number of frequency offset
+            bins. Defaults to 10.
+
+    Returns:
+        (dict): Evaluator.result of each network, by name
+    """
+    preprocessor = Preprocessor(signal_duration, snr_cut, normalize)
+    snr_values = source.snr_values()
+    indices = arange(len(source)) if indices is None else sort(asarray(indices))
+    indices = preprocessor.select(snr_values, indices)
+
+    bins = None
+    if frequency_offsets is not None:
+        fo = read_rows(frequency_offsets, indices).reshape(-1)
+        bins = linspace(fo.min(), fo.max(), n_frequency_offset_bins + 1)
+
+    predicts = {name: _load(model) for name, model in models.items()}
+    evaluators = {
+        name: Evaluator(source.n_classes, unique(snr_values[indices]), bins)
+        for name in models
+    }
+
+    for i in range(0, indices.size, batch_size):
+        idx = indices[i : i + batch_size]
+        x, y, s = source.read(idx)
+        x = preprocessor.transform(x, source.channels_last)
+        f = None if bins is None else fo[i : i + batch_size]
+        for name, predict in predicts.items():
+            evaluators[name].update(asarray(predict(x)), y, s, f)
+
+    return {name: e.result() for name, e in evaluators.items()}
+
+
+def print_results(results):
+    """Print the accuracies of evaluate as a table"""
+    names = list(results)
+    first = results[names[0]]
+    print(f"{'':>14}" + "".join(f"{n:>20}" for n in names))
+    print(
+        f"{'accuracy':>14}" + "".join(f"{results[n]['accuracy']:>20.3f}" for n in names)
+    )
+    for i, snr in enumerate(first["snr"]):
+        print(
+            f"{'snr ' + str(snr):>14}"
+            + "".join(f"{results[n]['accuracy_per_snr'][i]:>20.3f}" for n in names)
+        )
+    if "frequency_offset_bins" in first:
+        edges = first["frequency_offset_bins"]
+        for i in range(edges.size - 1):
+            print(
+                f"{'fo %.2g' % ((edges[i] + edges[i + 1]) / 2):>14}"
+                + "".join(
+                    f"{results[n]['accuracy_per_frequency_offset'][i]:>20.3f}"
+                    for n in names
+                )
+            )
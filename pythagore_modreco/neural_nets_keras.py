@@ -27,6 +27,7 @@
 #
 # 2022 November 25
 
+from tensorflow.keras import mixed_precision
 from tensorflow.keras.models import Model
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import (
@@ -38,12 +39,15 @@ from tensorflow.keras.layers import (
 from tensorflow.keras.layers import Flatten, Dense, Dropout, Reshape, Activation
 from tensorflow.keras.layers import (
     Conv1D,
+    SeparableConv1D,
     ZeroPadding2D,
     Convolution2D,
     MaxPooling1D,
     MaxPooling2D,
 )
 
+from .utils import NETWORKS
+
 
 def get_LModCNN(input_shp, output_shp, verbose=False):
     """Generate LModCNN architecture as defined in Courtat and du Mas des Bourboux,
@@ -77,7 +81,14 @@ def get_LModCNN(input_shp, output_shp, verbose=False):
     model.add(Dense(units=256, activation="relu", kernel_initializer="he_normal"))
     model.add(Dropout(rate=0.5))
 
-    model.add(Dense(output_shp, activation="softmax", kernel_initializer="he_normal"))
+    model.add(
+        Dense(
+            output_shp,
+            activation="softmax",
+            kernel_initializer="he_normal",
+            dtype="float32",
+        )
+    )
 
     if verbose:
         model.summary()
@@ -94,122 +105,102 @@ def get_LModCNNResNetRelu(input_shp, output_shp, verbose=False):
         output_shp (list): shape of the output data [n_classes]
         verbose (bool): set verbosity
     """
-    kernel_size = 7
-
-    X_input = Input(input_shp)
-
-    X = Conv1D(
-        filters=8,
-        kernel_size=1,
-        activation="relu",
-        padding="same",
-        input_shape=input_shp,
-        kernel_initializer="glorot_uniform",
-    )(X_input)
-
-    X_shortcut = X
-
-    X = Conv1D(
-        filters=8,
-        kernel_size=kernel_size,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = Conv1D(
-        filters=8,
-        kernel_size=kernel_size,
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = add([X, X_shortcut])
-    X = Activation("relu")(X)
-
-    X = Conv1D(
-        filters=16,
-        kernel_size=1,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-
-    X_shortcut = X
-
-    X = Conv1D(
-        filters=16,
-        kernel_size=kernel_size,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = Conv1D(
-        filters=16,
-        kernel_size=kernel_size,
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = add([X, X_shortcut])
-    X = Activation("relu")(X)
-
-    X = Conv1D(
-        filters=32,
-        kernel_size=1,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-
-    X_shortcut = X
-
-    X = Conv1D(
-        filters=32,
-        kernel_size=kernel_size,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = Conv1D(
-        filters=32,
-        kernel_size=kernel_size,
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = add([X, X_shortcut])
-    X = Activation("relu")(X)
+    return get_LMod(
+        input_shp, output_shp, verbose=verbose, **LMOD_PRESETS["LModCNNResNetRelu"]
+    )
 
-    X = Conv1D(
-        filters=64,
-        kernel_size=1,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
 
-    X_shortcut = X
+# configurations of get_LMod; the first two reproduce get_LModCNN and
+# get_LModCNNResNetRelu, the others trade accuracy for speed
+LMOD_PRESETS = {
+    "LModCNN": dict(),
+    "LModCNNResNetRelu": dict(residual=True),
+    "LModCNN-S": dict(width=0.5, separable=True),
+    "LModCNN-XS": dict(width=0.5, separable=True, strides=2),
+    "LModCNNResNetRelu-S": dict(residual=True, separable=True, strides=2),
+}
+
+
+def _lmod_conv(X, filters, kernel_size, separable, **kwargs):
+    """Conv1D, or depthwise-separable SeparableConv1D, with "same" padding"""
+    if separable and kernel_size > 1:
+        return SeparableConv1D(filters, kernel_size, padding="same", **kwargs)(X)
+    return Conv1D(filters, kernel_size, padding="same", **kwargs)(X)
+
+
+def get_LMod(
+    input_shp,
+    output_shp,
+    width=1.0,
+    n_stages=4,
+    base_filters=8,
+    kernel_size=7,
+    residual=False,
+    separable=False,
+    strides=1,
+    dense_units=256,
+    dropout=0.5,
+    verbose=False,
+):
+    """Generate a network of the Mod-L family, stages of convolutions whose
+    number of filters doubles at each stage, followed by a global average
+    pooling and a dense head, so that any signal length is accepted
+
+    With the default arguments this is get_LModCNN, and with residual=True
+    get_LModCNNResNetRelu, see LMOD_PRESETS.
 
-    X = Conv1D(
-        filters=64,
-        kernel_size=kernel_size,
-        activation="relu",
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = Conv1D(
-        filters=64,
-        kernel_size=kernel_size,
-        padding="same",
-        kernel_initializer="glorot_uniform",
-    )(X)
-    X = add([X, X_shortcut])
-
-    X = Activation("relu")(X)
+    Arguments:
+        input_shp (list): shape of the input data [signal_length,2], batch is omitted
+        output_shp (list): shape of the output data [n_classes]
+        width (float): multiplier of the number of filters of every stage
+        n_stages (int): number of stages
+        base_filters (int): number of filters of the first stage, before width
+        kernel_size (int): kernel size of the convolutions
+        residual (bool): each stage is a 1x1 projection followed by two
+            convolutions with a residual connexion, instead of one convolution
+        separable (bool): use depthwise-separable convolutions, except for the
+            first convolution of the plain network and the 1x1 projections
+        strides (int): stride of the first convolution of every stage but the
+            first, which divides the signal length
+        dense_units (int): number of units of the hidden dense layer
+        dropout (float): dropout rate of the hidden dense layer
+        verbose (bool): set verbosity
+    """
+    X_input = Input(input_shp)
+    X = X_input
+
+    for stage in range(n_stages):
+        filters = max(1, round(base_filters * width * 2**stage))
+        stride = strides if stage > 0 else 1
+
+        if residual:
+            X = Conv1D(filters, 1, strides=stride, activation="relu", padding="same")(X)
+            X_shortcut = X
+            X = _lmod_conv(X, filters, kernel_size, separable, activation="relu")
+            X = _lmod_conv(X, filters, kernel_size, separable)
+            X = add([X, X_shortcut])
+            X = Activation("relu")(X)
+        else:
+            X = _lmod_conv(
+                X,
+                filters,
+                kernel_size,
+                separable and stage > 0,
+                strides=stride,
+                activation="relu",
+            )
 
     X = GlobalAveragePooling1D()(X)
 
-    X = Dense(units=256, activation="relu", kernel_initializer="he_normal")(X)
-    X = Dropout(rate=0.5)(X)
+    X = Dense(units=dense_units, activation="relu", kernel_initializer="he_normal")(X)
+    X = Dropout(rate=dropout)(X)
 
-    X = Dense(output_shp, activation="softmax", kernel_initializer="he_normal")(X)
+    X = Dense(
+        output_shp,
+        activation="softmax",
+        kernel_initializer="he_normal",
+        dtype="float32",
+    )(X)
 
     model = Model(inputs=X_input, outputs=X)
 
@@ -265,7 +256,14 @@ def get_RMLConvNet(input_shp, output_shp, verbose=False):
     model.add(Flatten())
     model.add(Dense(256, activation="relu", kernel_initializer="he_normal"))
     model.add(Dropout(dr))
-    model.add(Dense(output_shp, kernel_initializer="he_normal", activation="softmax"))
+    model.add(
+        Dense(
+            output_shp,
+            kernel_initializer="he_normal",
+            activation="softmax",
+            dtype="float32",
+        )
+    )
 
     if verbose:
         model.summary()
@@ -369,7 +367,14 @@ def get_RMLCNNVGG(input_shp, output_shp, verbose=False):
     model.add(Dense(128, activation="selu", kernel_initializer="he_normal"))
     model.add(Dropout(dr))
 
-    model.add(Dense(output_shp, activation="softmax", kernel_initializer="he_normal"))
+    model.add(
+        Dense(
+            output_shp,
+            activation="softmax",
+            kernel_initializer="he_normal",
+            dtype="float32",
+        )
+    )
 
     if verbose:
         model.summary()
@@ -497,7 +502,11 @@ def get_RMLResNet(input_shp, output_shp, verbose=False):
     X = AlphaDropout(0.3)(X)
     # Full Con 3
     X = Dense(
-        output_shp, kernel_initializer="he_normal", name="dense3", activation="softmax"
+        output_shp,
+        kernel_initializer="he_normal",
+        name="dense3",
+        activation="softmax",
+        dtype="float32",
     )(X)
 
     model = Model(inputs=X_input, outputs=X)
@@ -506,3 +515,63 @@ def get_RMLResNet(input_shp, output_shp, verbose=False):
         model.summary()
 
     return model
+
+
+# precision policies accepted by get_model
+PRECISIONS = ["float32", "mixed_bfloat16"]
+
+# builders of the networks accepted by get_model, besides LMOD_PRESETS
+BUILDERS = {name: globals()[f"get_{name}"] for name in NETWORKS}
+
+
+def get_model(name, input_shp, output_shp, precision="float32", verbose=False):
+    """Generate one of the networks of this module under a precision policy
+
+    With "mixed_bfloat16", layers compute in bfloat16 and keep float32
+    weights; the softmax output layer always computes in float32 for
+    numerical stability.
+
+    Arguments:
+        name (str): network name in BUILDERS, e.g. "LModCNN", or a preset of
+            get_LMod in LMOD_PRESETS, e.g. "LModCNN-S"
+        input_shp (list): shape of the input data [signal_length,2], batch is omitted
+        output_shp (list): shape of the output data [n_classes]
+        precision (str): one of PRECISIONS
+        verbose (bool): set verbosity
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision}")
+    if name not in BUILDERS and name not in LMOD_PRESETS:
+        valid = list(BUILDERS) + [n for n in LMOD_PRESETS if n not in BUILDERS]
+        raise ValueError(f"network must be one of {valid}, got {name}")
+
+    previous_policy = mixed_precision.global_policy()
+    mixed_precision.set_global_policy(precision)
+    try:
+        if name in BUILDERS:
+            model = BUILDERS[name](input_shp, output_shp, verbose=verbose)
+        else:
+            model = get_LMod(
+                input_shp, output_shp, verbose=verbose, **LMOD_PRESETS[name]
+            )
+    finally:
+        mixed_precision.set_global_policy(previous_policy)
+
+    return model
+
+
+def compile_model(model, jit_compile=False, optimizer="adam"):
+    """Compile a network as done in the notebook
+
+    Arguments:
+        model (keras.Model): network
+        jit_compile (bool): compile the training and inference steps with XLA
+        optimizer (str or keras.optimizers.Optimizer): optimizer
+    """
+    model.compile(
+        loss="categorical_crossentropy",
+        optimizer=optimizer,
+        metrics=["accuracy"],
+        jit_compile=jit_compile,
+    )
+    return model
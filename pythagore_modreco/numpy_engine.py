@@ -0,0 +1,304 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from numpy import asarray, empty, exp, float32, load, matmul, maximum, savez, zeros
+
+"""
+TensorFlow-free inference of the light networks (get_LModCNN and
+get_LModCNNResNetRelu) with NumPy, for fast cold start and small workers
+"""
+
+ARCHITECTURES = ["LModCNN", "LModCNNResNetRelu"]
+
+# layers of get_LModCNN and get_LModCNNResNetRelu, Dropout is the identity at
+# inference
+LAYERS = (
+    "InputLayer",
+    "Conv1D",
+    "Add",
+    "Activation",
+    "GlobalAveragePooling1D",
+    "Dense",
+    "Dropout",
+)
+
+
+def extract_weights(model):
+    """Get the Conv1D and Dense weights of a Keras model, in layer order
+
+    Does not import TensorFlow, only the model object is used.
+
+    Args:
+        model (keras.Model): model from get_LModCNN or get_LModCNNResNetRelu
+
+    Returns:
+        (list of tuples): (kernel, bias) of every Conv1D and Dense layer
+    """
+    check_model(model)
+    weights = []
+    for layer in model.layers:
+        if type(layer).__name__ in ("Conv1D", "Dense"):
+            kernel, bias = layer.get_weights()
+            weights.append((kernel.astype(float32), bias.astype(float32)))
+    return weights
+
+
+def check_model(model):
+    """Check that the engine implements a Keras model and get its architecture
+
+    Only the models of get_LMod without separable convolutions nor strides,
+    whatever their width and number of stages, are implemented.
+
+    Args:
+        model (keras.Model): model to check
+
+    Returns:
+        (str): one of ARCHITECTURES, LModCNNResNetRelu if the model has
+            residual connexions
+
+    Raises:
+        ValueError: if the model has a layer or a convolution setting that the
+            engine does not implement
+    """
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind not in LAYERS:
+            raise ValueError(
+                f"layer {layer.name} of type {kind} is not implemented by the "
+                f"NumPy engine, which supports {list(LAYERS)}"
+            )
+        if kind == "Conv1D":
+            settings = {
+                "strides": tuple(layer.strides),
+                "dilation_rate": tuple(layer.dilation_rate),
+                "padding": layer.padding,
+            }
+            if settings != {"strides": (1,), "dilation_rate": (1,), "padding": "same"}:
+                raise ValueError(
+                    f"Conv1D layer {layer.name} with {settings} is not implemented "
+                    "by the NumPy engine, only strides 1, dilation 1 and 'same' "
+                    "padding are"
+                )
+    n_dense = sum(type(layer).__name__ == "Dense" for layer in model.layers)
+    if n_dense != 2:
+        raise ValueError(f"the NumPy engine expects 2 Dense layers, got {n_dense}")
+    if any(type(layer).__name__ == "Add" for layer in model.layers):
+        return "LModCNNResNetRelu"
+    return "LModCNN"
+
+
+def _guess_architecture(weights):
+    """Name of the architecture from the number of layers"""
+    n_conv = sum(k.ndim == 3 for k, _ in weights)
+    if n_conv == 4:
+        return "LModCNN"
+    if n_conv == 12:
+        return "LModCNNResNetRelu"
+    raise ValueError(f"no architecture with {n_conv} Conv1D layers")
+
+
+def save_weights(model, fname, architecture=None):
+    """Save the weights of a Keras model for the NumPy engine
+
+    Args:
+        model (keras.Model): model from get_LModCNN or get_LModCNNResNetRelu
+        fname (str): path of the .npz file
+        architecture (str, optional): one of ARCHITECTURES. If None it is
+            guessed from the layers. Defaults to None.
+    """
+    weights = extract_weights(model)
+    if architecture is None:
+        architecture = check_model(model)
+    arrays = {"architecture": asarray(architecture)}
+    for i, (kernel, bias) in enumerate(weights):
+        arrays[f"kernel_{i}"] = kernel
+        arrays[f"bias_{i}"] = bias
+    savez(fname, **arrays)
+
+
+class NumpyEngine:
+    """Batched NumPy inference of Mod-LCNN and Mod-LRCNN
+
+    Convolutions are computed as a single matrix product over an im2col
+    buffer; all intermediate buffers are allocated once per input shape and
+    reused between calls.
+
+    Args:
+        weights (list of tuples): (kernel, bias) of every Conv1D and Dense layer,
+            see extract_weights
+        architecture (str, optional): one of ARCHITECTURES. If None it is guessed
+            from the layers. Defaults to None.
+    """
+
+    def __init__(self, weights, architecture=None):
+        if architecture is None:
+            architecture = _guess_architecture(weights)
+        if architecture not in ARCHITECTURES:
+            raise ValueError(
+                f"architecture must be one of {ARCHITECTURES}, got {architecture}"
+            )
+        self.architecture = architecture
+        self.convs = [(k, b) for k, b in weights if k.ndim == 3]
+        self.dense = [(k, b) for k, b in weights if k.ndim == 2]
+        self._shape = None
+        self._buffers = None
+
+    @classmethod
+    def from_keras(cls, model, architecture=None):
+        """Build the engine from a Keras model
+
+        Args:
+            model (keras.Model): model from get_LModCNN or get_LModCNNResNetRelu
+            architecture (str, optional): see NumpyEngine. Defaults to None.
+
+        Returns:
+            (NumpyEngine): engine
+        """
+        if architecture is None:
+            architecture = check_model(model)
+        return cls(extract_weights(model), architecture)
+
+    @classmethod
+    def from_file(cls, fname):
+        """Build the engine from weights saved by save_weights
+
+        Args:
+            fname (str): path of the .npz file
+
+        Returns:
+            (NumpyEngine): engine
+        """
+        with load(fname) as f:
+            n = sum(k.startswith("kernel_") for k in f.files)
+            weights = [(f[f"kernel_{i}"], f[f"bias_{i}"]) for i in range(n)]
+            architecture = str(f["architecture"])
+        return cls(weights, architecture)
+
+    def _allocate(self, batch, length):
+        """Allocate the im2col and output buffers of every convolution"""
+        self._buffers = []
+        for kernel, _ in self.convs:
+            k, c, f = kernel.shape
+            # the im2col borders are zero and never written: 'same' padding
+            cols = zeros((batch, length, k * c), dtype=float32)
+            out = empty((batch, length, f), dtype=float32)
+            self._buffers.append((cols, out))
+        self._shape = (batch, length)
+
+    def _conv(self, i, x, relu):
+        """Conv1D with 'same' padding and stride 1
+
+        Args:
+            i (int): index of the convolution
+            x (array): input, shape (batch, length, channels)
+            relu (bool): apply a relu activation
+
+        Returns:
+            (array): output buffer, shape (batch, length, filters)
+        """
+        kernel, bias = self.convs[i]
+        cols, out = self._buffers[i]
+        k, c, f = kernel.shape
+        length = x.shape[1]
+        left = (k - 1) // 2
+        for j in range(k):
+            o = j - left
+            t0, t1 = max(0, -o), min(length, length - o)
+            cols[:, t0:t1, j * c : (j + 1) * c] = x[:, t0 + o : t1 + o, :]
+        matmul(cols, kernel.reshape(k * c, f), out=out)
+        out += bias
+        if relu:
+            maximum(out, 0.0, out=out)
+        return out
+
+    def _head(self, x):
+        """Global average pooling then the dense layers
+
+        Args:
+            x (array): features, shape (batch, length, channels)
+
+        Returns:
+            (array): class probabilities, shape (batch, n_classes)
+        """
+        (k1, b1), (k2, b2) = self.dense
+        h = x.mean(axis=1)
+        h = maximum(h @ k1 + b1, 0.0)
+        z = h @ k2 + b2
+        z -= z.max(axis=1, keepdims=True)
+        exp(z, out=z)
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+    def predict_on_batch(self, x):
+        """Predict class probabilities of a batch
+
+        Args:
+            x (array): signals, shape (batch, length, 2)
+
+        Returns:
+            (array): class probabilities, shape (batch, n_classes)
+        """
+        x = asarray(x, dtype=float32)
+        if self._shape != x.shape[:2]:
+            self._allocate(*x.shape[:2])
+
+        if self.architecture == "LModCNN":
+            for i in range(len(self.convs)):
+                x = self._conv(i, x, relu=True)
+        else:
+            # 4 residual stages of 3 convolutions: 1x1, kxk + relu, kxk
+            for i in range(0, len(self.convs), 3):
+                shortcut = self._conv(i, x, relu=True)
+                x = self._conv(i + 1, shortcut, relu=True)
+                x = self._conv(i + 2, x, relu=False)
+                x += shortcut
+                maximum(x, 0.0, out=x)
+
+        return self._head(x)
+
+    def predict(self, x, batch_size=256):
+        """Predict class probabilities of a set of signals
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            batch_size (int, optional): batch size. Defaults to 256.
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes)
+        """
+        y = None
+        for i in range(0, x.shape[0], batch_size):
+            p = self.predict_on_batch(x[i : i + batch_size])
+            if y is None:
+                y = empty((x.shape[0], p.shape[1]), dtype=float32)
+            y[i : i + p.shape[0]] = p
+        return y
+
+    def __call__(self, x):
+        return self.predict_on_batch(x)
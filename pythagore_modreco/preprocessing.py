@@ -0,0 +1,218 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+from numpy import arange, argsort, array_equal, asarray, einsum, empty, sqrt
+from numpy.lib.format import open_memmap
+
+from .data import read_rows
+
+"""
+Preprocessing of the signals before training: transposition to (n, length, 2),
+truncation, cut in SNR and power normalization, done in a single chunked pass
+"""
+
+
+class Preprocessor:
+    """Transpose, truncate, cut in SNR and power normalize signals by chunks
+
+    Every chunk is written in float32 directly into the output array, so that
+    the peak memory is the output plus one chunk.
+
+    Args:
+        signal_duration (int, optional): number of samples to keep. If None keeps
+            all. Defaults to None.
+        snr_cut (float, optional): keep signals with snr>=snr_cut. If None keeps
+            all. Defaults to None.
+        normalize (bool, optional): normalize the power of each signal.
+            Defaults to True.
+        chunk_size (int, optional): number of signals processed at once.
+            Defaults to 4096.
+    """
+
+    def __init__(
+        self, signal_duration=None, snr_cut=None, normalize=True, chunk_size=4096
+    ):
+        self.signal_duration = signal_duration
+        self.snr_cut = snr_cut
+        self.normalize = normalize
+        self.chunk_size = chunk_size
+
+    def output_length(self, length):
+        """Number of samples per signal after truncation
+
+        Args:
+            length (int): number of samples per input signal
+
+        Returns:
+            (int): number of samples per output signal
+        """
+        if self.signal_duration is None:
+            return length
+        return min(length, self.signal_duration)
+
+    def select(self, snrs, indices=None):
+        """Indices of the signals passing the SNR cut
+
+        Args:
+            snrs (array): snr of every signal
+            indices (array of int, optional): candidate indices. If None all
+                signals are candidates. Defaults to None.
+
+        Returns:
+            (array of int): selected indices, in the order of indices
+        """
+        snrs = asarray(snrs).reshape(-1)
+        if indices is None:
+            indices = arange(snrs.size)
+        if self.snr_cut is None:
+            return asarray(indices)
+        return asarray(indices)[snrs[indices] >= self.snr_cut]
+
+    def transform(self, x, channels_last=False, out=None):
+        """Preprocess a chunk of signals
+
+        Args:
+            x (array): signals, shape (n, 2, length) or (n, length, 2)
+            channels_last (bool, optional): signals are stored as (n, length, 2).
+                Defaults to False.
+            out (array, optional): float32 output, shape (n, length, 2).
+                If None it is allocated. Defaults to None.
+
+        Returns:
+            (array): float32 signals, shape (n, length, 2)
+        """
+        if not channels_last:
+            x = x.transpose((0, 2, 1))
+        x = x[:, : self.output_length(x.shape[1]), :]
+        if out is None:
+            out = empty(x.shape, dtype="float32")
+        out[...] = x
+        if self.normalize:
+            power = einsum("ijk,ijk->i", out, out) / (out.shape[1] * out.shape[2])
+            out /= sqrt(power)[:, None, None]
+        return out
+
+    def run(self, signals, indices, channels_last=False, out=None):
+        """Preprocess a selection of signals
+
+        The rows are read in file order and written back at the position of
+        their index in indices.
+
+        Args:
+            signals (array-like): signals, numpy array, memmap or h5py dataset
+            indices (array of int): indices of the signals to process
+            channels_last (bool, optional): signals are stored as (n, length, 2).
+                Defaults to False.
+            out (array or str, optional): preallocated float32 output, or path of
+                a .npy file created as a memmap. If None it is allocated.
+                Defaults to None.
+
+        Returns:
+            (array): float32 signals, shape (len(indices), length, 2)
+        """
+        length = self.output_length(signals.shape[1 if channels_last else 2])
+        shape = (len(indices), length, 2)
+        if out is None:
+            out = empty(shape, dtype="float32")
+        elif isinstance(out, str):
+            out = open_memmap(out, mode="w+", dtype="float32", shape=shape)
+
+        indices = asarray(indices)
+        order = argsort(indices, kind="stable")
+        in_order = array_equal(order, arange(order.size))
+        indices = indices[order]
+        contiguous = array_equal(indices, arange(signals.shape[0]))
+        for i0 in range(0, len(indices), self.chunk_size):
+            i1 = min(i0 + self.chunk_size, len(indices))
+            if contiguous:
+                x = signals[i0:i1]
+            else:
+                x = read_rows(signals, indices[i0:i1])
+            if in_order:
+                self.transform(x, channels_last, out=out[i0:i1])
+            else:
+                out[order[i0:i1]] = self.transform(x, channels_last)
+
+        return out
+
+    def __call__(self, source, indices=None, out=None):
+        """Preprocess the signals of a SignalSource
+
+        Args:
+            source (data.SignalSource): dataset source
+            indices (array of int, optional): candidate indices, in any order,
+                e.g. from utils.split_indices. If None all signals are
+                candidates. Defaults to None.
+            out (array or str, optional): see run. Defaults to None.
+
+        Returns:
+            (tuple of arrays): signals, class indices, snrs, in the order of
+                indices
+        """
+        snrs = source.snr_values()
+        indices = self.select(snrs, indices)
+        signals = self.run(source.signals, indices, source.channels_last, out=out)
+        labels = source.label_values()[indices]
+        return signals, labels, snrs[indices]
+
+
+def preprocess(
+    signals,
+    labels,
+    snrs,
+    signal_duration=None,
+    snr_cut=None,
+    normalize=True,
+    channels_last=False,
+    out=None,
+    chunk_size=4096,
+):
+    """Preprocess the arrays returned by the readers of data.py
+
+    Arguments:
+        signals (array): signals, shape (n, 2, length) or (n, length, 2)
+        labels (array): labels associated to signals, class indices or one-hot
+        snrs (array): snr of every signal
+        signal_duration (int): number of samples to keep. If None keeps all.
+        snr_cut (float): keep signals with snr>=snr_cut. If None keeps all.
+        normalize (bool): normalize the power of each signal
+        channels_last (bool): signals are stored as (n, length, 2)
+        out (array or str): see Preprocessor.run
+        chunk_size (int): number of signals processed at once
+
+    Returns:
+        (tuple of arrays): signals, labels, snrs
+    """
+    preprocessor = Preprocessor(signal_duration, snr_cut, normalize, chunk_size)
+    snrs = asarray(snrs).reshape(-1)
+    indices = preprocessor.select(snrs)
+    signals = preprocessor.run(signals, indices, channels_last, out=out)
+    if len(indices) < snrs.size:
+        return signals, labels[indices], snrs[indices]
+    return signals, labels, snrs
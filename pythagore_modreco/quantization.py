@@ -0,0 +1,236 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import time
+from numpy import asarray, empty, float32, round as np_round, unique
+from numpy.random import default_rng
+
+import tensorflow as tf
+
+"""
+Quantized TensorFlow Lite export of the light networks (get_LModCNN,
+get_LModCNNResNetRelu) for CPU inference, with a runner and a parity check
+against the Keras model
+"""
+
+QUANTIZATION_MODES = ["float32", "float16", "int8"]
+
+
+def representative_dataset(signals, n_calibration=500, seed=0):
+    """Calibration generator for post-training int8 quantization
+
+    Arguments:
+        signals (array): preprocessed signals, shape (n, length, 2), e.g. drawn
+            from the training split
+        n_calibration (int): number of signals used for calibration
+        seed (int): random seed to draw the signals
+
+    Returns:
+        (callable): generator function as expected by TFLiteConverter
+    """
+    n = min(n_calibration, signals.shape[0])
+    idx = default_rng(seed).choice(signals.shape[0], size=n, replace=False)
+
+    def _generator():
+        for i in idx:
+            yield [asarray(signals[i : i + 1], dtype=float32)]
+
+    return _generator
+
+
+def export_tflite(
+    model, fname=None, mode="int8", calibration_signals=None, n_calibration=500
+):
+    """Convert a Keras model to a TensorFlow Lite flatbuffer
+
+    Arguments:
+        model (keras.Model): trained model, e.g. from get_LModCNN
+        fname (str): path of the .tflite file, not written if None
+        mode (str): "float32", "float16" (weights stored in float16) or "int8"
+            (weights and activations quantized, float input/output)
+        calibration_signals (array): preprocessed signals used to calibrate
+            the int8 activation ranges, see representative_dataset
+        n_calibration (int): number of calibration signals
+
+    Returns:
+        (bytes): flatbuffer content
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"mode must be one of {QUANTIZATION_MODES}, got {mode}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if mode == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        if calibration_signals is None:
+            raise ValueError("int8 quantization requires calibration_signals")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(
+            calibration_signals, n_calibration
+        )
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    content = converter.convert()
+
+    if fname is not None:
+        with open(fname, "wb") as f:
+            f.write(content)
+
+    return content
+
+
+class TFLiteRunner:
+    """Batched inference with a TensorFlow Lite model
+
+    Args:
+        model (str or bytes): path of a .tflite file or flatbuffer content
+        num_threads (int, optional): number of interpreter threads. If None
+            uses the TensorFlow Lite default. Defaults to None.
+    """
+
+    def __init__(self, model, num_threads=None):
+        if isinstance(model, bytes):
+            self.interpreter = tf.lite.Interpreter(
+                model_content=model, num_threads=num_threads
+            )
+        else:
+            self.interpreter = tf.lite.Interpreter(
+                model_path=model, num_threads=num_threads
+            )
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._shape = None
+
+    def predict_on_batch(self, x):
+        """Predict class probabilities of a batch
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes)
+        """
+        if self._shape != x.shape:
+            self.interpreter.resize_tensor_input(self._input["index"], x.shape)
+            self.interpreter.allocate_tensors()
+            self._shape = x.shape
+
+        scale, zero_point = self._input["quantization"]
+        if self._input["dtype"] != float32 and scale != 0:
+            x = np_round(x / scale + zero_point)
+        self.interpreter.set_tensor(
+            self._input["index"], asarray(x, dtype=self._input["dtype"])
+        )
+        self.interpreter.invoke()
+        y = self.interpreter.get_tensor(self._output["index"])
+
+        scale, zero_point = self._output["quantization"]
+        if self._output["dtype"] != float32 and scale != 0:
+            y = (y.astype(float32) - zero_point) * scale
+        return y
+
+    def predict(self, x, batch_size=256):
+        """Predict class probabilities of a set of signals
+
+        Args:
+            x (array): signals, shape (n, length, 2)
+            batch_size (int, optional): batch size. Defaults to 256.
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes)
+        """
+        y = None
+        for i in range(0, x.shape[0], batch_size):
+            p = self.predict_on_batch(x[i : i + batch_size])
+            if y is None:
+                y = empty((x.shape[0], p.shape[1]), dtype=float32)
+            y[i : i + p.shape[0]] = p
+        return y
+
+
+def _timed_predict(predict_on_batch, x, batch_size):
+    """Predict x by batches, the first batch being run once before timing
+
+    Returns:
+        (tuple): predicted class indices, seconds per signal
+    """
+    predict_on_batch(x[:batch_size])
+    pred = empty(x.shape[0], dtype="int64")
+    t = time.perf_counter()
+    for i in range(0, x.shape[0], batch_size):
+        pred[i : i + batch_size] = asarray(
+            predict_on_batch(x[i : i + batch_size])
+        ).argmax(axis=1)
+    return pred, (time.perf_counter() - t) / x.shape[0]
+
+
+def parity_check(model, runner, x, labels, snrs, batch_size=256):
+    """Compare a quantized model with its Keras reference
+
+    Arguments:
+        model (keras.Model): reference model
+        runner (TFLiteRunner): quantized model
+        x (array): preprocessed test signals, shape (n, length, 2)
+        labels (array): class indices
+        snrs (array): snr of every signal
+        batch_size (int): inference batch size
+
+    Returns:
+        (dict): per SNR accuracies of both models and their difference,
+            agreement rate between predictions, time per signal and speedup
+    """
+    labels = asarray(labels)
+    snrs = asarray(snrs).reshape(-1)
+    pred_keras, t_keras = _timed_predict(model.predict_on_batch, x, batch_size)
+    pred_tflite, t_tflite = _timed_predict(runner.predict_on_batch, x, batch_size)
+
+    per_snr = []
+    for snr in unique(snrs):
+        w = snrs == snr
+        acc_keras = float((pred_keras[w] == labels[w]).mean())
+        acc_tflite = float((pred_tflite[w] == labels[w]).mean())
+        per_snr.append(
+            {
+                "snr": float(snr),
+                "n": int(w.sum()),
+                "accuracy_keras": acc_keras,
+                "accuracy_tflite": acc_tflite,
+                "delta": acc_tflite - acc_keras,
+            }
+        )
+
+    return {
+        "accuracy_keras": float((pred_keras == labels).mean()),
+        "accuracy_tflite": float((pred_tflite == labels).mean()),
+        "agreement": float((pred_keras == pred_tflite).mean()),
+        "per_snr": per_snr,
+        "ms_per_signal_keras": 1000.0 * t_keras,
+        "ms_per_signal_tflite": 1000.0 * t_tflite,
+        "speedup": t_keras / t_tflite,
+    }
@@ -0,0 +1,296 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import json
+import shutil
+import time
+from datetime import datetime, timezone
+from os import listdir, makedirs, replace
+from os.path import abspath, exists, isdir, join
+from numpy import asarray, concatenate, zeros
+
+"""
+Registry of trained networks stored with their metadata, loaded once per
+process and warmed up at load time so that the first request does not pay
+the parsing and tracing costs.
+
+Each entry is a directory holding the Keras model (model.keras, or model.h5
+with Keras versions predating the .keras format), a SavedModel exported for
+inference (serving/) and metadata.json.
+"""
+
+# loaded models of this process, by (registry root, name, serving)
+_CACHE = dict()
+
+
+class LoadedModel:
+    """Network loaded from a registry, see ModelRegistry.load
+
+    Args:
+        predict (callable): function from a float32 batch of shape
+            (n, length, 2) to class probabilities
+        metadata (dict): metadata of the entry
+        timings (dict): load, warm-up and first inference durations in
+            seconds
+        owner (object, optional): object to keep alive while the model is used,
+            e.g. the loaded SavedModel. Defaults to None.
+    """
+
+    def __init__(self, predict, metadata, timings, owner=None):
+        self._predict = predict
+        self.metadata = metadata
+        self.timings = timings
+        self._owner = owner
+
+    @property
+    def classes(self):
+        return self.metadata.get("classes")
+
+    def predict_on_batch(self, x):
+        """Class probabilities of a batch of signals, shape (n, length, 2)"""
+        return asarray(self._predict(asarray(x, dtype="float32")))
+
+    def predict(self, x, batch_size=512):
+        """Class probabilities of signals of shape (n, length, 2), by batches"""
+        return concatenate(
+            [
+                self.predict_on_batch(x[i : i + batch_size])
+                for i in range(0, x.shape[0], batch_size)
+            ]
+        )
+
+    __call__ = predict_on_batch
+
+
+class ModelRegistry:
+    """Directory of trained networks and their metadata
+
+    Args:
+        root (str): registry directory, created if needed
+    """
+
+    def __init__(self, root):
+        self.root = abspath(root)
+        makedirs(self.root, exist_ok=True)
+
+    def _path(self, name, *parts):
+        return join(self.root, name, *parts)
+
+    def _keras_file(self, name):
+        """Path of the Keras model of an entry, .keras or .h5"""
+        fname = self._path(name, "model.keras")
+        return fname if exists(fname) else self._path(name, "model.h5")
+
+    def names(self):
+        """Names of the stored networks"""
+        return sorted(
+            d for d in listdir(self.root) if exists(self._path(d, "metadata.json"))
+        )
+
+    def metadata(self, name):
+        """Metadata of a stored network, read without loading TensorFlow"""
+        with open(self._path(name, "metadata.json")) as f:
+            return json.load(f)
+
+    def register(
+        self,
+        name,
+        model,
+        dataset=None,
+        classes=None,
+        signal_length=None,
+        normalize=True,
+        network=None,
+        overwrite=False,
+        **extra,
+    ):
+        """Store a trained network
+
+        Arguments:
+            name (str): entry name, e.g. "AugMod-LModCNN"
+            model (keras.Model or str): network, or path of a model saved by
+                model.save, e.g. the .h5 files written by the notebook
+            dataset (str): dataset the network was trained on
+            classes (list of str): class names, in the order of the outputs
+            signal_length (int): number of samples per signal used for
+                training, None if any length is accepted
+            normalize (bool): the signals are power normalized, see
+                preprocessing.Preprocessor
+            network (str): architecture, e.g. "LModCNN"
+            overwrite (bool): replace an existing entry
+            **extra: other JSON-serializable metadata
+
+        Returns:
+            (dict): metadata of the entry
+        """
+        import tensorflow as tf
+
+        if isinstance(model, str):
+            model = tf.keras.models.load_model(model, compile=False)
+        if exists(self._path(name)) and not overwrite:
+            raise FileExistsError(f"{name} is already in the registry")
+
+        metadata = dict(
+            name=name,
+            network=network,
+            dataset=dataset,
+            classes=list(classes) if classes is not None else None,
+            signal_length=signal_length,
+            normalize=normalize,
+            input_shape=list(model.input_shape[1:]),
+            n_classes=int(model.output_shape[-1]),
+            created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            tensorflow=tf.__version__,
+            **extra,
+        )
+
+        # written aside and moved in place last, so that a failed export leaves
+        # no partial entry
+        tmp = self._path(f".{name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        makedirs(tmp)
+        # Keras versions having model.export also have the .keras format
+        model.save(join(tmp, "model.keras" if hasattr(model, "export") else "model.h5"))
+        serving = tf.Module()
+        serving.model = model
+        serving.serve = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[
+                tf.TensorSpec([None] + metadata["input_shape"], tf.float32)
+            ],
+        )
+        tf.saved_model.save(serving, join(tmp, "serving"))
+        with open(join(tmp, "metadata.json"), "w") as f:
+            json.dump(metadata, f, indent=2)
+        if exists(self._path(name)):
+            shutil.rmtree(self._path(name))
+        replace(tmp, self._path(name))
+
+        for key in [k for k in _CACHE if k[:2] == (self.root, name)]:
+            del _CACHE[key]
+        return metadata
+
+    def load(self, name, serving=True, warmup_batch_sizes=(1,)):
+        """Load a stored network, once per process
+
+        The network is warmed up with zero batches of the given sizes and of
+        the training signal length (or 128 samples if any length is accepted),
+        so that the tracing is done at load time.
+
+        Arguments:
+            name (str): entry name
+            serving (bool): load the exported SavedModel, whose serving function
+                is already traced, rather than rebuilding the Keras model
+            warmup_batch_sizes (list of int): batch sizes of the warm-up
+
+        Returns:
+            (LoadedModel): loaded network, whose timings hold "load_s",
+                "warmup_s" and "first_inference_s"
+        """
+        key = (self.root, name, serving)
+        if key in _CACHE:
+            return _CACHE[key]
+
+        import tensorflow as tf
+
+        metadata = self.metadata(name)
+        t = time.perf_counter()
+        if serving and isdir(self._path(name, "serving")):
+            owner = tf.saved_model.load(self._path(name, "serving"))
+            predict = owner.serve
+        else:
+            owner = model = tf.keras.models.load_model(
+                self._keras_file(name), compile=False
+            )
+            predict = tf.function(
+                model,
+                input_signature=[
+                    tf.TensorSpec([None] + metadata["input_shape"], tf.float32)
+                ],
+            )
+        timings = {"load_s": time.perf_counter() - t}
+
+        length = metadata["signal_length"] or metadata["input_shape"][0] or 128
+        first = None
+        t = time.perf_counter()
+        for batch_size in warmup_batch_sizes:
+            t0 = time.perf_counter()
+            predict(zeros((batch_size, length, 2), dtype="float32"))
+            if first is None:
+                first = time.perf_counter() - t0
+        timings["warmup_s"] = time.perf_counter() - t
+        timings["first_inference_s"] = first
+
+        loaded = LoadedModel(predict, metadata, timings, owner)
+        _CACHE[key] = loaded
+        return loaded
+
+
+def compare_startup(fname, registry, name, batch_size=1, length=None):
+    """Startup latency of a model file loaded with load_model, as the notebook
+    does, against the registry
+
+    Both are measured in the calling process, TensorFlow being already
+    imported.
+
+    Arguments:
+        fname (str): path of a model saved by model.save
+        registry (ModelRegistry): registry holding the same network
+        name (str): entry name
+        batch_size (int): batch size of the first inference
+        length (int): signal length of the first inference. If None uses the
+            registry metadata.
+
+    Returns:
+        (dict): "load_model_s" and "load_model_first_inference_s", then
+            "registry_load_s", "registry_warmup_s" and
+            "registry_first_inference_s", the first inference after the
+            warm-up
+    """
+    from tensorflow.keras.models import load_model
+
+    metadata = registry.metadata(name)
+    length = length or metadata["signal_length"] or metadata["input_shape"][0] or 128
+    x = zeros((batch_size, length, 2), dtype="float32")
+
+    t = time.perf_counter()
+    model = load_model(fname)
+    out = {"load_model_s": time.perf_counter() - t}
+    t = time.perf_counter()
+    model.predict(x, verbose=0)
+    out["load_model_first_inference_s"] = time.perf_counter() - t
+
+    _CACHE.pop((registry.root, name, True), None)
+    loaded = registry.load(name, warmup_batch_sizes=(batch_size,))
+    out["registry_load_s"] = loaded.timings["load_s"]
+    out["registry_warmup_s"] = loaded.timings["warmup_s"]
+    t = time.perf_counter()
+    loaded.predict_on_batch(x)
+    out["registry_first_inference_s"] = time.perf_counter() - t
+    return out
@@ -0,0 +1,254 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from os import environ, makedirs
+from os.path import join
+from numpy import array, load, save, savetxt, zeros
+
+from .utils import NETWORKS, DYNAMIC_NETWORKS
+
+"""
+Parallel training of several networks, datasets and seeds on a CPU node.
+
+The preprocessed splits are saved once as .npy files and memory-mapped
+read-only by every worker, instead of being copied into each process.
+This module does not import TensorFlow: each worker imports it after its
+thread limits are set.
+"""
+
+
+def share_dataset(directory, X_train, y_train, X_test, y_test):
+    """Save preprocessed splits so that workers can memory-map them
+
+    Arguments:
+        directory (str): where to write the .npy files
+        X_train (array): training signals, shape (n, length, 2)
+        y_train (array): training class indices
+        X_test (array): test signals, shape (n, length, 2)
+        y_test (array): test class indices
+
+    Returns:
+        (dict): paths of the saved arrays
+    """
+    makedirs(directory, exist_ok=True)
+    paths = dict()
+    for name, x in [
+        ("X_train", X_train),
+        ("y_train", y_train),
+        ("X_test", X_test),
+        ("y_test", y_test),
+    ]:
+        paths[name] = join(directory, f"{name}.npy")
+        save(paths[name], x)
+    return paths
+
+
+def _init_worker(n_threads):
+    """Limit the number of threads of a worker, before TensorFlow is imported"""
+    for var in [
+        "OMP_NUM_THREADS",
+        "MKL_NUM_THREADS",
+        "OPENBLAS_NUM_THREADS",
+        "TF_NUM_INTRAOP_THREADS",
+    ]:
+        environ[var] = str(n_threads)
+    environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _file_name(prefix, job, extension):
+    """File name following the notebook convention, with the seed if any"""
+    name = f"{prefix}-{job['dataset']}-{job['network']}-trained{job['signal_duration']}"
+    if job.get("seed") is not None:
+        name += f"-seed{job['seed']}"
+    return name + extension
+
+
+def train_job(job):
+    """Train one network, meant to run in a worker process
+
+    Arguments:
+        job (dict): with keys network, dataset, seed, data (paths from
+            share_dataset), log_path, nb_epoch, batch_size
+
+    Returns:
+        (dict): job description, output paths, final accuracies and mean
+            epoch time
+    """
+    from tensorflow.keras.backend import clear_session
+    from tensorflow.keras.utils import set_random_seed
+
+    from . import neural_nets_keras
+    from .callbacks import TimeHistory
+    from .data import SignalSource
+    from .tf_data import make_dataset
+
+    if job.get("seed") is not None:
+        set_random_seed(job["seed"])
+
+    X_train = load(job["data"]["X_train"], mmap_mode="r")
+    X_test = load(job["data"]["X_test"], mmap_mode="r")
+    y_train = load(job["data"]["y_train"])
+    y_test = load(job["data"]["y_test"])
+    n_classes = int(max(y_train.max(), y_test.max())) + 1
+    job = dict(job, signal_duration=X_train.shape[1])
+
+    name_network = job["network"]
+    input_shp = list(X_train.shape[1:])
+    if name_network in DYNAMIC_NETWORKS:
+        input_shp[0] = None
+
+    clear_session()
+    model = getattr(neural_nets_keras, f"get_{name_network}")(input_shp, n_classes)
+    model.compile(
+        loss="categorical_crossentropy", optimizer="adam", metrics=["accuracy"]
+    )
+
+    # batches are sliced out of the memory-mapped arrays, giving them to fit
+    # directly would copy them into every worker
+    def _dataset(x, y, shuffle):
+        source = SignalSource(x, y, zeros(len(y)), n_classes, channels_last=True)
+        return make_dataset(
+            source,
+            batch_size=job["batch_size"],
+            normalize=False,
+            shuffle_buffer=min(len(y), 16 * job["batch_size"]) if shuffle else None,
+            seed=job.get("seed"),
+        )
+
+    time_callback = TimeHistory()
+    history = model.fit(
+        _dataset(X_train, y_train, shuffle=True),
+        epochs=job["nb_epoch"],
+        validation_data=_dataset(X_test, y_test, shuffle=False),
+        verbose=0,
+        callbacks=[time_callback],
+    )
+
+    log_path = job["log_path"]
+    paths = {
+        "model": join(log_path, _file_name("model", job, ".h5")),
+        "history": join(log_path, _file_name("history", job, ".txt")),
+        "history_time": join(log_path, _file_name("history_time", job, ".txt")),
+    }
+    model.save(paths["model"])
+    savetxt(
+        paths["history"],
+        array(
+            list(
+                zip(
+                    history.epoch,
+                    history.history["val_accuracy"],
+                    history.history["accuracy"],
+                )
+            )
+        ),
+    )
+    savetxt(paths["history_time"], array(list(zip(history.epoch, time_callback.times))))
+
+    clear_session()
+
+    return {
+        "network": name_network,
+        "dataset": job["dataset"],
+        "seed": job.get("seed"),
+        "paths": paths,
+        "val_accuracy": float(history.history["val_accuracy"][-1]),
+        "accuracy": float(history.history["accuracy"][-1]),
+        "s_per_epoch": sum(time_callback.times) / len(time_callback.times),
+    }
+
+
+def run_trainings(
+    data,
+    log_path,
+    networks=NETWORKS,
+    seeds=(None,),
+    nb_epoch=200,
+    batch_size=512,
+    n_workers=None,
+    threads_per_worker=None,
+):
+    """Train every (dataset, network, seed) combination across a process pool
+
+    Writes the model, history and history_time files of each training in
+    log_path with the same names as the notebook (with a -seed suffix when a
+    seed is given).
+
+    Arguments:
+        data (dict): dataset name -> paths returned by share_dataset
+        log_path (str): where to write the models and histories
+        networks (list of str): networks to train, see NETWORKS
+        seeds (list of int): random seeds, None for no seeding
+        nb_epoch (int): number of epochs
+        batch_size (int): batch size
+        n_workers (int): number of worker processes. If None, the number of
+            trainings capped to the number of cores.
+        threads_per_worker (int): threads used by each worker. If None the cores
+            are divided between the workers.
+
+    Returns:
+        (list of dict): results of train_job, in the order of the jobs
+    """
+    makedirs(log_path, exist_ok=True)
+    jobs = [
+        {
+            "network": network,
+            "dataset": dataset,
+            "seed": seed,
+            "data": paths,
+            "log_path": log_path,
+            "nb_epoch": nb_epoch,
+            "batch_size": batch_size,
+        }
+        for dataset, paths in data.items()
+        for network in networks
+        for seed in seeds
+    ]
+
+    n_cores = multiprocessing.cpu_count()
+    if n_workers is None:
+        n_workers = min(len(jobs), n_cores)
+    if threads_per_worker is None:
+        threads_per_worker = max(1, n_cores // n_workers)
+
+    # spawn: workers must not inherit an initialized TensorFlow runtime
+    with ProcessPoolExecutor(
+        n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads_per_worker,),
+    ) as executor:
+        return list(executor.map(train_job, jobs))
@@ -0,0 +1,293 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import asyncio
+import threading
+import time
+from collections import deque
+from numpy import asarray, concatenate, cumsum, percentile, split
+
+"""
+Asynchronous micro-batching inference: requests from concurrent callers are
+coalesced into batches and sent to the model in a single forward pass
+"""
+
+
+class BatchingServer:
+    """Coalesce concurrent prediction requests into batches
+
+    Requests are queued; a worker task takes the first pending request, waits
+    at most max_wait seconds for more requests until max_batch_size signals
+    are gathered, runs one forward pass per signal shape in a worker thread,
+    and scatters the results back to the callers.
+
+    Must be used from a running asyncio event loop, see LocalClient for
+    callers living in other threads.
+
+    Args:
+        model (keras.Model or callable): classifier returning class
+            probabilities for a batch of signals of shape (n, length, 2)
+        max_batch_size (int, optional): maximum number of signals per forward
+            pass. A larger single request is not split. Defaults to 256.
+        max_wait (float, optional): maximum time in seconds the first request
+            of a batch waits for other requests. Defaults to 0.005.
+        stats_window (int, optional): number of recent requests kept for the
+            latency statistics. Defaults to 10000.
+    """
+
+    def __init__(self, model, max_batch_size=256, max_wait=0.005, stats_window=10000):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._predict = getattr(model, "predict_on_batch", model)
+        self._queue = None
+        self._worker = None
+        self._latencies = deque(maxlen=stats_window)
+        self._n_requests = 0
+        self._n_signals = 0
+        self._n_batches = 0
+        self._busy_time = 0.0
+        self._t_start = None
+        self._in_flight = []
+        self._held = None
+
+    @classmethod
+    def from_file(cls, fname, **kwargs):
+        """Create a server around a model saved by model.save
+
+        Args:
+            fname (str): path of the saved model
+            **kwargs: see BatchingServer
+
+        Returns:
+            (BatchingServer): server
+        """
+        from tensorflow.keras.models import load_model
+
+        return cls(load_model(fname, compile=False), **kwargs)
+
+    async def start(self):
+        """Start the batching worker on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._t_start = time.perf_counter()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching worker, pending requests, including those of the
+        batch being gathered or run, are cancelled"""
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        for _, future, _ in self._in_flight:
+            future.cancel()
+        self._in_flight = []
+        if self._held is not None:
+            self._held[1].cancel()
+            self._held = None
+        while not self._queue.empty():
+            self._queue.get_nowait()[1].cancel()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    async def predict(self, signals):
+        """Predict class probabilities of a few signals
+
+        Args:
+            signals (array): signals, shape (n, length, 2)
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes)
+        """
+        if self._worker is None or self._worker.done():
+            raise RuntimeError("the server is not running, call start first")
+        future = asyncio.get_running_loop().create_future()
+        request = (asarray(signals, dtype="float32"), future, time.perf_counter())
+        await self._queue.put(request)
+        return await future
+
+    async def _collect(self):
+        """Wait for a first request then gather more until the batch is full or
+        max_wait is elapsed
+
+        A request that would take the batch over max_batch_size is held back
+        as the first request of the next batch. Requests are also kept in
+        _in_flight until their results are set, so that stop can cancel them.
+
+        Returns:
+            (list): pending (signals, future, enqueue time) requests
+        """
+        requests = self._in_flight
+        if self._held is not None:
+            requests.append(self._held)
+            self._held = None
+        else:
+            requests.append(await self._queue.get())
+        size = requests[0][0].shape[0]
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if size + request[0].shape[0] > self.max_batch_size:
+                self._held = request
+                break
+            requests.append(request)
+            size += request[0].shape[0]
+        return requests
+
+    def _forward(self, requests):
+        """Run one forward pass per signal shape
+
+        Args:
+            requests (list): (signals, future, enqueue time) requests
+
+        Returns:
+            (list of arrays): class probabilities for each request
+        """
+        by_shape = dict()
+        for i, (signals, _, _) in enumerate(requests):
+            by_shape.setdefault(signals.shape[1:], []).append(i)
+
+        results = [None] * len(requests)
+        for idx in by_shape.values():
+            x = concatenate([requests[i][0] for i in idx])
+            probs = asarray(self._predict(x))
+            offsets = cumsum([requests[i][0].shape[0] for i in idx])[:-1]
+            for i, p in zip(idx, split(probs, offsets)):
+                results[i] = p
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._in_flight = []
+            requests = await self._collect()
+            t = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(None, self._forward, requests)
+            except Exception as e:
+                for _, future, _ in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            t_end = time.perf_counter()
+            self._busy_time += t_end - t
+            self._n_batches += 1
+            for (signals, future, t_enqueue), probs in zip(requests, results):
+                self._n_requests += 1
+                self._n_signals += signals.shape[0]
+                self._latencies.append(t_end - t_enqueue)
+                if not future.done():
+                    future.set_result(probs)
+
+    def stats(self):
+        """Latency and throughput statistics
+
+        Returns:
+            (dict): number of requests, signals and batches, mean batch size,
+                throughput in signals/s since start, fraction of time spent in
+                the model, and p50/p95/p99 request latencies in ms
+        """
+        elapsed = time.perf_counter() - self._t_start if self._t_start else 0.0
+        latencies = asarray(self._latencies) * 1000.0
+        p50, p95, p99 = (
+            percentile(latencies, [50, 95, 99]) if latencies.size else (0.0,) * 3
+        )
+        return {
+            "requests": self._n_requests,
+            "signals": self._n_signals,
+            "batches": self._n_batches,
+            "mean_batch_size": self._n_signals / max(self._n_batches, 1),
+            "throughput": self._n_signals / elapsed if elapsed > 0 else 0.0,
+            "busy_fraction": self._busy_time / elapsed if elapsed > 0 else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+            "latency_p99_ms": float(p99),
+        }
+
+
+class LocalClient:
+    """In-process client running a BatchingServer in a background event loop
+
+    predict can be called concurrently from any number of threads, which
+    makes the batching testable without any network service.
+
+    Args:
+        model (keras.Model or callable): see BatchingServer
+        **kwargs: see BatchingServer
+    """
+
+    def __init__(self, model, **kwargs):
+        self.server = BatchingServer(model, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self.server.start())
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def predict(self, signals):
+        """Predict class probabilities of a few signals, blocks until done
+
+        Args:
+            signals (array): signals, shape (n, length, 2)
+
+        Returns:
+            (array): class probabilities, shape (n, n_classes)
+        """
+        return self._call(self.server.predict(signals))
+
+    def stats(self):
+        """See BatchingServer.stats"""
+        return self.server.stats()
+
+    def close(self):
+        """Stop the server and its event loop"""
+        self._call(self.server.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
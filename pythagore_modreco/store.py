@@ -0,0 +1,312 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import argparse
+from os import remove
+from h5py import File
+from numpy import abs as np_abs
+from numpy import dtype as np_dtype
+from numpy import arange, array, concatenate, empty, flatnonzero, isin
+from numpy import lexsort, ones, rint
+from numpy.lib.format import open_memmap
+
+from .data import SignalSource, augmod_source, chunk_rows_for, rml2016_source
+from .data import rml2018_source
+
+"""
+Compact on-disk store of a dataset: signals quantized to int16 or float16 with
+a per-signal scale, rows sorted by (modulation, snr) and an index of the row
+range of each (modulation, snr) pair, so that a selection of classes and snrs
+is read as a few contiguous blocks.
+
+Usage:
+    python -m pythagore_modreco.store augmod AugMod.hdf5 AugMod-int16.h5
+"""
+
+STORE_DTYPES = ["int16", "float16"]
+SOURCES = {
+    "augmod": augmod_source,
+    "rml2016": rml2016_source,
+    "rml2018": rml2018_source,
+}
+
+_FULL_SCALE = {"int16": 32767.0, "float16": 1.0}
+
+
+def quantize(x, dtype="int16"):
+    """Quantize signals with one scale per signal
+
+    Arguments:
+        x (array): float signals, shape (n, ...)
+        dtype (str): "int16" or "float16"
+
+    Returns:
+        (tuple of arrays): quantized signals and float32 scales, shape (n,),
+            such that x ~ q * scale
+    """
+    amax = np_abs(x).reshape(x.shape[0], -1).max(axis=1)
+    scale = (amax / _FULL_SCALE[dtype]).astype("float32")
+    scale[scale == 0] = 1.0
+    q = x / scale.reshape((-1,) + (1,) * (x.ndim - 1))
+    if dtype == "int16":
+        q = rint(q)
+    return q.astype(dtype), scale
+
+
+class _Dequantized:
+    """Read-only float32 view of quantized signals, sliced like an h5py dataset"""
+
+    def __init__(self, signals, scale):
+        self.quantized = signals
+        self.scale = scale
+        self.shape = signals.shape
+        self.chunks = signals.chunks
+        self.dtype = "float32"
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        x = self.quantized[key].astype("float32")
+        x *= self.scale[key].reshape((-1,) + (1,) * (x.ndim - 1))
+        return x
+
+
+def convert(
+    source,
+    fname,
+    dtype="int16",
+    chunk_rows=None,
+    compression=None,
+    block_rows=16384,
+):
+    """Write a SignalSource as a compact store
+
+    The source is read once, sequentially, by blocks. Each quantized block is
+    scattered to its sorted rows in a temporary .npy file next to the store,
+    which is then copied into the store in order and removed.
+
+    Arguments:
+        source (data.SignalSource): dataset to convert
+        fname (str): path of the HDF5 store
+        dtype (str): "int16" or "float16"
+        chunk_rows (int): number of signals per HDF5 chunk. If None chunks are
+            about 1 MiB, see data.chunk_rows_for.
+        compression (str): HDF5 compression filter, e.g. "gzip" or "lzf"
+        block_rows (int): number of signals converted at once
+    """
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"dtype must be one of {STORE_DTYPES}")
+
+    labels = source.label_values()
+    snrs = source.snr_values()
+    order = lexsort((arange(len(source)), snrs, labels))
+    labels, snrs = labels[order], snrs[order]
+
+    # (modulation, snr) groups are contiguous once sorted
+    breaks = flatnonzero((labels[1:] != labels[:-1]) | (snrs[1:] != snrs[:-1])) + 1
+    starts = concatenate([[0], breaks]).astype("int64")
+    stops = concatenate([breaks, [len(order)]]).astype("int64")
+
+    classes = source.classes
+    if isinstance(classes, int):
+        classes = [str(c) for c in range(classes)]
+    length = source.signal_length
+    n = len(order)
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for(2 * length * np_dtype(dtype).itemsize)
+
+    with File(fname, "w") as f:
+        f.attrs["dtype"] = dtype
+        f["classes"] = array([c.encode() for c in classes])
+        signals = f.create_dataset(
+            "signals",
+            (n, 2, length),
+            dtype=dtype,
+            chunks=(min(chunk_rows, max(n, 1)), 2, length),
+            compression=compression,
+            shuffle=compression is not None,
+        )
+        scale = f.create_dataset("scale", (n,), dtype="float32")
+        f["modulations"] = labels.astype("int64")
+        f["snr"] = snrs.astype("float32")
+        f["index/modulation"] = labels[starts].astype("int64")
+        f["index/snr"] = snrs[starts].astype("float32")
+        f["index/start"] = starts
+        f["index/stop"] = stops
+
+        # destination row of every source row
+        rank = empty(n, dtype="int64")
+        rank[order] = arange(n)
+        staging = open_memmap(
+            fname + ".tmp.npy", mode="w+", dtype=dtype, shape=(n, 2, length)
+        )
+        scales = empty(n, dtype="float32")
+        try:
+            for i0 in range(0, n, block_rows):
+                i1 = min(i0 + block_rows, n)
+                x, _, _ = source.read(arange(i0, i1))
+                if source.channels_last:
+                    x = x.transpose((0, 2, 1))
+                staging[rank[i0:i1]], scales[rank[i0:i1]] = quantize(x, dtype)
+            for i0 in range(0, n, block_rows):
+                signals[i0 : i0 + block_rows] = staging[i0 : i0 + block_rows]
+            scale[:] = scales
+        finally:
+            del staging
+            remove(fname + ".tmp.npy")
+
+
+class CompactStore(SignalSource):
+    """Reader of a compact store written by convert
+
+    Behaves as a SignalSource returning float32 signals of shape
+    (n, 2, length), so it can be given to tf_data.make_dataset or
+    preprocessing.Preprocessor, and adds selections through the
+    (modulation, snr) index.
+
+    Args:
+        fname (str): path of the HDF5 store
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._file = File(fname, "r")
+        f = self._file
+        super().__init__(
+            _Dequantized(f["signals"], f["scale"]),
+            f["modulations"],
+            f["snr"],
+            [c.decode() for c in f["classes"]],
+            owner=f,
+        )
+        self.index = {
+            k: f["index"][k][:] for k in ("modulation", "snr", "start", "stop")
+        }
+
+    def ranges(self, modulations=None, snrs=None, snr_cut=None):
+        """Row ranges of a selection, from the index only
+
+        Arguments:
+            modulations (list of str or int): class names or indices to keep.
+                If None keeps all.
+            snrs (list of float): snrs to keep. If None keeps all.
+            snr_cut (float): keep snr >= snr_cut. If None keeps all.
+
+        Returns:
+            (list of tuples): (start, stop) of the selected contiguous blocks
+        """
+        keep = ones(self.index["start"].size, dtype=bool)
+        if modulations is not None:
+            mods = [
+                self.classes.index(m) if isinstance(m, str) else m for m in modulations
+            ]
+            keep &= isin(self.index["modulation"], mods)
+        if snrs is not None:
+            keep &= isin(self.index["snr"], snrs)
+        if snr_cut is not None:
+            keep &= self.index["snr"] >= snr_cut
+
+        ranges = []
+        for start, stop in zip(self.index["start"][keep], self.index["stop"][keep]):
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], int(stop))
+            else:
+                ranges.append((int(start), int(stop)))
+        return ranges
+
+    def select(self, modulations=None, snrs=None, snr_cut=None):
+        """Sorted row indices of a selection, see ranges
+
+        Returns:
+            (array of int): indices, e.g. for tf_data.make_dataset
+        """
+        ranges = self.ranges(modulations, snrs, snr_cut)
+        return concatenate([arange(a, b) for a, b in ranges] + [empty(0, "int64")])
+
+    def load(self, modulations=None, snrs=None, snr_cut=None):
+        """Read a selection, block by block, see ranges
+
+        Returns:
+            (tuple of arrays): float32 signals (n, 2, length), class indices,
+                snrs
+        """
+        ranges = self.ranges(modulations, snrs, snr_cut)
+        n = sum(b - a for a, b in ranges)
+        signals = empty((n, 2, self.signal_length), dtype="float32")
+        labels = empty(n, dtype="int64")
+        snr = empty(n, dtype="float32")
+        i = 0
+        for a, b in ranges:
+            signals[i : i + b - a] = self.signals[a:b]
+            labels[i : i + b - a] = self.labels[a:b]
+            snr[i : i + b - a] = self.snrs[a:b]
+            i += b - a
+        return signals, labels, snr
+
+
+def read_store(fname, modulations=None, snrs=None, snr_cut=None):
+    """Read a selection of a compact store
+
+    Arguments:
+        fname (str): path of the HDF5 store
+        modulations, snrs, snr_cut: see CompactStore.ranges
+
+    Returns:
+        (tuple): float32 signals (n, 2, length), class indices, snrs, classes
+    """
+    with CompactStore(fname) as store:
+        signals, labels, snr = store.load(modulations, snrs, snr_cut)
+        return signals, labels, snr, store.classes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pythagore_modreco.store",
+        description="Convert a dataset to a compact quantized store",
+    )
+    parser.add_argument("dataset", choices=sorted(SOURCES))
+    parser.add_argument("source", help="input dataset path")
+    parser.add_argument("fname", help="output HDF5 path")
+    parser.add_argument("--dtype", choices=STORE_DTYPES, default="int16")
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    parser.add_argument("--compression", default=None)
+    args = parser.parse_args(argv)
+
+    convert(
+        SOURCES[args.dataset](args.source),
+        args.fname,
+        dtype=args.dtype,
+        chunk_rows=args.chunk_rows,
+        compression=args.compression,
+    )
+
+
+if __name__ == "__main__":
+    main()
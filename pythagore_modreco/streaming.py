@@ -0,0 +1,254 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import asyncio
+import time
+from numpy import arange, asarray, concatenate, einsum, iscomplexobj, memmap, sqrt
+from numpy import stack, zeros
+from numpy.lib.stride_tricks import sliding_window_view
+
+"""
+Sliding-window classification of continuous I/Q streams with bounded memory
+"""
+
+
+def _as_iq(chunk):
+    """Convert a chunk of samples to a float32 array of shape (n, 2)
+
+    Args:
+        chunk (array): complex samples, shape (n,), or I/Q samples, shape (n, 2)
+
+    Returns:
+        (array): float32 I/Q samples, shape (n, 2)
+    """
+    chunk = asarray(chunk)
+    if iscomplexobj(chunk):
+        chunk = stack([chunk.real, chunk.imag], axis=-1)
+    return chunk.astype("float32", copy=False)
+
+
+def memmap_stream(fname, chunk_size=65536, dtype="complex64", offset=0):
+    """Iterate over a raw I/Q capture file without loading it
+
+    Args:
+        fname (str): path of the capture, raw interleaved samples
+        chunk_size (int, optional): number of samples per chunk. Defaults to 65536.
+        dtype (str, optional): "complex64" for interleaved float32 I/Q, or any
+            real dtype for interleaved I/Q of that type. Defaults to "complex64".
+        offset (int, optional): header size in bytes. Defaults to 0.
+
+    Yields:
+        (array): chunks of samples, views on the memory-mapped file
+    """
+    samples = memmap(fname, dtype=dtype, mode="r", offset=offset)
+    if not iscomplexobj(samples):
+        samples = samples[: samples.size // 2 * 2].reshape(-1, 2)
+    for i in range(0, samples.shape[0], chunk_size):
+        yield samples[i : i + chunk_size]
+
+
+class StreamingClassifier:
+    """Classify overlapping windows cut from an unbounded I/Q stream
+
+    Windows of `window` samples are cut every `hop` samples and copied into a
+    preallocated batch, which is sent to the model when it is full or when
+    the oldest pending window has waited more than max_latency seconds. Only
+    the last window of samples and one batch are kept in memory. Streams can
+    be iterables, see classify, or asyncio queues, see aclassify.
+
+    The model should accept a dynamic or matching time dimension, e.g.
+    get_LModCNN or get_LModCNNResNetRelu built with input_shp=[None, 2].
+
+    Args:
+        model (keras.Model or callable): classifier returning class
+            probabilities for a batch of shape (batch_size, window, 2)
+        window (int, optional): number of samples per window. Defaults to 128.
+        hop (int, optional): number of samples between window starts. If None
+            windows do not overlap. Defaults to None.
+        batch_size (int, optional): number of windows per forward pass.
+            Defaults to 64.
+        normalize (bool, optional): normalize the power of each window, as done
+            for training. Defaults to True.
+        max_latency (float, optional): maximum time in seconds a window waits for
+            its batch to fill. If None batches are only sent when full or at the
+            end of the stream. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        model,
+        window=128,
+        hop=None,
+        batch_size=64,
+        normalize=True,
+        max_latency=None,
+    ):
+        self.model = model
+        self.window = window
+        self.hop = window if hop is None else hop
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.max_latency = max_latency
+        self._predict = getattr(model, "predict_on_batch", model)
+        self._batch = zeros((batch_size, window, 2), dtype="float32")
+        self._starts = zeros(batch_size, dtype="int64")
+
+    def _flush(self, n):
+        """Run the model on the first n pending windows
+
+        Args:
+            n (int): number of pending windows
+
+        Returns:
+            (tuple of arrays): window starts and class probabilities
+        """
+        x = self._batch
+        if self.normalize:
+            power = einsum("ijk,ijk->i", x[:n], x[:n]) / (2 * self.window)
+            power[power == 0] = 1.0
+            x[:n] /= sqrt(power)[:, None, None]
+        # always run on the full batch so that the model sees a single shape
+        probs = asarray(self._predict(x))[:n]
+        return self._starts[:n].copy(), probs
+
+    def _cut(self, state, chunk):
+        """Copy the windows completed by a chunk into the batch
+
+        Args:
+            state (dict): position in the stream, see _new_state
+            chunk (array): samples, see classify
+
+        Yields:
+            (tuple of arrays): see _flush, for every batch filled
+        """
+        buf = concatenate([state["tail"], _as_iq(chunk)])
+        first = state["next_start"] - state["tail_start"]
+
+        if buf.shape[0] - first >= self.window:
+            windows = sliding_window_view(buf[first:], self.window, axis=0)
+            windows = windows[:: self.hop]
+            k = 0
+            while k < windows.shape[0]:
+                n = state["n"]
+                m = min(windows.shape[0] - k, self.batch_size - n)
+                self._batch[n : n + m] = windows[k : k + m].transpose((0, 2, 1))
+                self._starts[n : n + m] = (
+                    state["next_start"] + arange(k, k + m) * self.hop
+                )
+                if n == 0:
+                    state["t_first"] = time.perf_counter()
+                state["n"] = n + m
+                k += m
+                if state["n"] == self.batch_size:
+                    yield self._flush(state["n"])
+                    state["n"] = 0
+            state["next_start"] += windows.shape[0] * self.hop
+
+        keep = state["next_start"] - state["tail_start"]
+        if keep < buf.shape[0]:
+            state["tail"] = buf[keep:].copy()
+            state["tail_start"] = state["next_start"]
+        else:
+            state["tail"] = buf[:0]
+            state["tail_start"] += buf.shape[0]
+
+    def _new_state(self):
+        """Position at the start of a stream: the samples not yet in a window
+        (tail), the stream index of tail[0] and of the next window, the number
+        of pending windows and the time the first of them was cut"""
+        return {
+            "tail": zeros((0, 2), dtype="float32"),
+            "tail_start": 0,
+            "next_start": 0,
+            "n": 0,
+            "t_first": None,
+        }
+
+    def _time_left(self, state):
+        """Time left before the pending windows must be sent, None if no limit"""
+        if state["n"] == 0 or self.max_latency is None:
+            return None
+        return state["t_first"] + self.max_latency - time.perf_counter()
+
+    def classify(self, stream):
+        """Classify the windows of a stream
+
+        max_latency is checked each time a chunk arrives, use aclassify for a
+        stream that can go quiet.
+
+        Args:
+            stream (iterable of arrays): chunks of complex samples, shape (n,),
+                or I/Q samples, shape (n, 2), e.g. from memmap_stream
+
+        Yields:
+            (tuple of arrays): index of the first sample of each window, shape
+                (n_windows,), and class probabilities, shape (n_windows, n_classes)
+        """
+        state = self._new_state()
+        for chunk in stream:
+            yield from self._cut(state, chunk)
+            left = self._time_left(state)
+            if left is not None and left <= 0:
+                yield self._flush(state["n"])
+                state["n"] = 0
+
+        if state["n"] > 0:
+            yield self._flush(state["n"])
+
+    async def aclassify(self, queue):
+        """Classify the windows of a stream fed through an asyncio queue
+
+        The wait for the next chunk is bounded by max_latency, so pending
+        windows are sent in time even when the stream goes quiet.
+
+        Args:
+            queue (asyncio.Queue): chunks of samples, see classify, None ends
+                the stream
+
+        Yields:
+            (tuple of arrays): see classify
+        """
+        state = self._new_state()
+        while True:
+            left = self._time_left(state)
+            try:
+                chunk = await asyncio.wait_for(
+                    queue.get(), None if left is None else max(left, 0.0)
+                )
+            except asyncio.TimeoutError:
+                yield self._flush(state["n"])
+                state["n"] = 0
+                continue
+            if chunk is None:
+                break
+            for result in self._cut(state, chunk):
+                yield result
+
+        if state["n"] > 0:
+            yield self._flush(state["n"])
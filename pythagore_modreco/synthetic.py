@@ -0,0 +1,315 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from h5py import File
+from numpy import arange, array, cos, cumsum, exp, fft, linspace, meshgrid
+from numpy import pi, repeat, sin, sqrt, stack, zeros
+from numpy.random import SeedSequence, default_rng
+
+from .augmentation import Augmenter
+from .data import chunk_rows_for
+
+"""
+Offline generator of synthetic I/Q datasets written in the Augmod layout
+(classes, signals, modulations, snr, frequency_offsets), for load-testing
+the readers and the networks without downloading any dataset.
+
+Usage:
+    python -m pythagore_modreco.synthetic synthetic.hdf5 --n-signals 1000000
+"""
+
+CLASSES = ["BPSK", "QPSK", "8PSK", "16QAM", "64QAM", "2FSK", "4FSK", "OOK"]
+
+
+def _constellation(name):
+    """Unit average power symbols of a linear modulation"""
+    if name == "OOK":
+        return array([0.0, sqrt(2.0)], dtype="complex64")
+    if name.endswith("PSK"):
+        m = {"BPSK": 2, "QPSK": 4}.get(name) or int(name[:-3])
+        return exp(2j * pi * arange(m) / m).astype("complex64")
+    if name.endswith("QAM"):
+        side = int(sqrt(int(name[:-3])))
+        levels = arange(side) * 2.0 - (side - 1)
+        i, q = meshgrid(levels, levels)
+        points = (i + 1j * q).reshape(-1)
+        return (points / sqrt((abs(points) ** 2).mean())).astype("complex64")
+    raise ValueError(f"unknown modulation {name}")
+
+
+def _rrc_taps(sps, span=8, rolloff=0.35):
+    """Root raised cosine pulse, unit energy"""
+    t = linspace(-span / 2, span / 2, span * sps + 1)
+    taps = zeros(t.size)
+    for k, tk in enumerate(t):
+        if tk == 0:
+            taps[k] = 1 - rolloff + 4 * rolloff / pi
+        elif abs(abs(4 * rolloff * tk) - 1) < 1e-8:
+            taps[k] = (rolloff / sqrt(2)) * (
+                (1 + 2 / pi) * sin(pi / (4 * rolloff))
+                + (1 - 2 / pi) * cos(pi / (4 * rolloff))
+            )
+        else:
+            taps[k] = (
+                sin(pi * tk * (1 - rolloff))
+                + 4 * rolloff * tk * cos(pi * tk * (1 + rolloff))
+            ) / (pi * tk * (1 - (4 * rolloff * tk) ** 2))
+    return taps / sqrt((taps**2).sum())
+
+
+def modulate(name, n, length, sps, rng):
+    """Generate baseband signals of one modulation
+
+    Arguments:
+        name (str): modulation name, see CLASSES
+        n (int): number of signals
+        length (int): number of samples per signal
+        sps (int): samples per symbol
+        rng (numpy.random.Generator): random generator
+
+    Returns:
+        (array): complex64 signals with unit average power, shape (n, length)
+    """
+    n_symbols = length // sps + 16
+
+    if name.endswith("FSK"):
+        m = int(name[:-3])
+        symbols = rng.integers(m, size=(n, n_symbols))
+        # continuous phase FSK, modulation index 1
+        freq = (2 * symbols - (m - 1)) / (2.0 * sps)
+        phase = 2 * pi * cumsum(repeat(freq, sps, axis=1), axis=1)
+        start = rng.integers(sps * 8)
+        return exp(1j * phase[:, start : start + length]).astype("complex64")
+
+    points = _constellation(name)
+    symbols = points[rng.integers(points.size, size=(n, n_symbols))]
+    upsampled = zeros((n, n_symbols * sps), dtype="complex64")
+    upsampled[:, ::sps] = symbols
+    taps = _rrc_taps(sps)
+    size = upsampled.shape[1] + taps.size - 1
+    shaped = fft.ifft(fft.fft(upsampled, size, axis=1) * fft.fft(taps, size), axis=1)
+    start = taps.size + rng.integers(sps)
+    signals = shaped[:, start : start + length]
+    power = (abs(signals) ** 2).mean()
+    return (signals / sqrt(power)).astype("complex64")
+
+
+def generate(
+    n,
+    length=1024,
+    classes=CLASSES,
+    snrs=tuple(range(-10, 21, 2)),
+    max_frequency_offset=0.01,
+    sps=8,
+    seed=None,
+):
+    """Generate a batch of impaired signals with random classes
+
+    Arguments:
+        n (int): number of signals
+        length (int): number of samples per signal
+        classes (list of str): modulations, see CLASSES
+        snrs (list of float): SNRs in dB, drawn uniformly
+        max_frequency_offset (float): frequency offsets are drawn uniformly in
+            [-max_frequency_offset, max_frequency_offset], as a fraction of the
+            sample rate
+        sps (int): samples per symbol
+        seed (None, int or SeedSequence): random seed
+
+    Returns:
+        (dict): signals (n, 2, length) float32, modulations, snr and
+            frequency_offsets, as in read_augmod
+    """
+    rng = default_rng(seed)
+    modulations = rng.integers(len(classes), size=n)
+    z = zeros((n, length), dtype="complex64")
+    for c, name in enumerate(classes):
+        w = modulations == c
+        if w.any():
+            z[w] = modulate(name, int(w.sum()), length, sps, rng)
+
+    x, params = Augmenter(
+        max_frequency_offset=max_frequency_offset, normalize=False, seed=rng
+    )(stack([z.real, z.imag], axis=-1), return_params=True)
+
+    snr = array(snrs, dtype="float32")[rng.integers(len(snrs), size=n)]
+    sigma = sqrt(10 ** (-snr / 10) / 2).astype("float32")[:, None, None]
+    x += sigma * rng.standard_normal(x.shape, dtype="float32")
+
+    return {
+        "signals": x.transpose((0, 2, 1)),
+        "modulations": modulations,
+        "snr": snr,
+        "frequency_offsets": params.get(
+            "frequency_offset", zeros(n, dtype="float32")
+        ).astype("float32"),
+    }
+
+
+def _generate_chunk(args):
+    n, kwargs = args
+    return generate(n, **kwargs)
+
+
+def write_dataset(
+    fname,
+    n_signals,
+    length=1024,
+    classes=CLASSES,
+    snrs=tuple(range(-10, 21, 2)),
+    max_frequency_offset=0.01,
+    sps=8,
+    seed=0,
+    chunk_size=8192,
+    n_workers=None,
+    compression=None,
+    hdf5_chunk_rows=None,
+):
+    """Write a synthetic dataset readable by read_augmod and AugModDataset
+
+    Chunks of signals are generated in parallel by worker processes and
+    written in order by the calling process. At most two chunks per worker
+    are pending at a time, so that generated chunks do not pile up in memory
+    when writing is slower than generating.
+
+    Arguments:
+        fname (str): path of the HDF5 file
+        n_signals (int): number of signals
+        length (int): number of samples per signal
+        classes (list of str): modulations, see CLASSES
+        snrs (list of float): SNRs in dB
+        max_frequency_offset (float): maximum frequency offset, as a fraction of
+            the sample rate
+        sps (int): samples per symbol
+        seed (int): random seed, the output does not depend on n_workers
+        chunk_size (int): number of signals generated per task
+        n_workers (int): number of processes. If None uses all cores.
+        compression (str): HDF5 compression filter, e.g. "gzip"
+        hdf5_chunk_rows (int): number of signals per HDF5 chunk. If None chunks
+            are about 1 MiB, the size of the default h5py chunk cache.
+    """
+    if hdf5_chunk_rows is None:
+        hdf5_chunk_rows = chunk_rows_for(2 * length * 4)
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    n_chunks = -(-n_signals // chunk_size)
+    seeds = SeedSequence(seed).spawn(n_chunks)
+    kwargs = dict(
+        length=length,
+        classes=classes,
+        snrs=snrs,
+        max_frequency_offset=max_frequency_offset,
+        sps=sps,
+    )
+    tasks = (
+        (min(chunk_size, n_signals - i * chunk_size), dict(kwargs, seed=seeds[i]))
+        for i in range(n_chunks)
+    )
+
+    with File(fname, "w") as f:
+        f["classes"] = array([c.encode() for c in classes])
+        signals = f.create_dataset(
+            "signals",
+            (n_signals, 2, length),
+            dtype="float32",
+            chunks=(min(hdf5_chunk_rows, n_signals), 2, length),
+            compression=compression,
+        )
+        fields = {
+            k: f.create_dataset(k, (n_signals,), dtype=dtype)
+            for k, dtype in [
+                ("modulations", "int64"),
+                ("snr", "float32"),
+                ("frequency_offsets", "float32"),
+            ]
+        }
+
+        with ProcessPoolExecutor(
+            n_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            pending = deque(
+                executor.submit(_generate_chunk, task)
+                for task in islice(tasks, 2 * n_workers)
+            )
+            i0 = 0
+            while pending:
+                chunk = pending.popleft().result()
+                for task in islice(tasks, 1):
+                    pending.append(executor.submit(_generate_chunk, task))
+                i1 = i0 + chunk["signals"].shape[0]
+                signals[i0:i1] = chunk["signals"]
+                for k, dset in fields.items():
+                    dset[i0:i1] = chunk[k]
+                i0 = i1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pythagore_modreco.synthetic",
+        description="Generate a synthetic I/Q dataset in the Augmod layout",
+    )
+    parser.add_argument("fname", help="output HDF5 path")
+    parser.add_argument("--n-signals", type=int, default=100000)
+    parser.add_argument("--length", type=int, default=1024)
+    parser.add_argument("--classes", nargs="+", default=CLASSES)
+    parser.add_argument(
+        "--snrs", type=float, nargs="+", default=list(range(-10, 21, 2))
+    )
+    parser.add_argument("--max-frequency-offset", type=float, default=0.01)
+    parser.add_argument("--sps", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compression", default=None)
+    parser.add_argument("--hdf5-chunk-rows", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    write_dataset(
+        args.fname,
+        args.n_signals,
+        length=args.length,
+        classes=args.classes,
+        snrs=args.snrs,
+        max_frequency_offset=args.max_frequency_offset,
+        sps=args.sps,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        n_workers=args.workers,
+        compression=args.compression,
+        hdf5_chunk_rows=args.hdf5_chunk_rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
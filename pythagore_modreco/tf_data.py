@@ -0,0 +1,167 @@
+# Authors:
+#       Helion du Mas des Bourboux <helion.dumasdesbourboux'at'thalesgroup.com>
+#       Thomas Courtat <thomas.courtat'at'thalesgroup.com>
+#
+# MIT License
+#
+# Copyright (c) 2022 THALES
+#   All Rights Reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# 2026 October 18
+
+import tensorflow as tf
+from numpy import arange, array_split, asarray, sort
+from numpy.random import default_rng
+
+from .preprocessing import Preprocessor
+
+"""
+Builds tf.data input pipelines streaming signals from a dataset source
+(see data.augmod_source, data.rml2016_source and data.rml2018_source)
+"""
+
+
+def make_dataset(
+    source,
+    indices=None,
+    batch_size=512,
+    signal_duration=None,
+    snr_cut=None,
+    normalize=True,
+    shuffle_buffer=None,
+    block_size=4096,
+    one_hot=True,
+    num_parallel_calls=tf.data.AUTOTUNE,
+    seed=None,
+    augment=None,
+):
+    """Build a tf.data.Dataset streaming (signals, labels) batches from a source
+
+    The selected rows are read by blocks of block_size sorted indices, several
+    blocks being read in parallel. Each block goes through
+    preprocessing.Preprocessor on the fly, then the examples are shuffled in a
+    bounded buffer, batched and prefetched so that reading overlaps with
+    training.
+
+    Arguments:
+        source (data.SignalSource): dataset source
+        indices (array of int, optional): rows to use, e.g. from
+            utils.split_indices. If None uses all rows. Defaults to None.
+        batch_size (int, optional): batch size. Defaults to 512.
+        signal_duration (int, optional): number of samples to keep. If None keeps
+            all. Defaults to None.
+        snr_cut (float, optional): keep signals with snr>=snr_cut. If None keeps
+            all. Defaults to None.
+        normalize (bool, optional): normalize the power of each signal.
+            Defaults to True.
+        shuffle_buffer (int, optional): size of the shuffle buffer. If None the
+            examples are not shuffled and come in file order. Defaults to None.
+        block_size (int, optional): number of rows read at once.
+            Defaults to 4096.
+        one_hot (bool, optional): one-hot encode the labels, as expected by
+            categorical_crossentropy. Defaults to True.
+        num_parallel_calls (int, optional): number of blocks read in parallel.
+            Defaults to tf.data.AUTOTUNE.
+        seed (int, optional): shuffling seed. Defaults to None.
+        augment (callable, optional): applied to every preprocessed block of
+            signals in the reading threads, e.g. augmentation.Augmenter.
+            Impairments are drawn again at every epoch. Defaults to None.
+
+    Returns:
+        (tf.data.Dataset): batches of (signals, labels)
+    """
+    preprocessor = Preprocessor(signal_duration, snr_cut, normalize)
+    indices = arange(len(source)) if indices is None else sort(asarray(indices))
+    if snr_cut is not None:
+        indices = preprocessor.select(source.snr_values(), indices)
+    n_blocks = max(1, -(-indices.size // block_size))
+    blocks = array_split(indices, n_blocks)
+
+    shuffle = shuffle_buffer is not None
+    rng = default_rng(seed)
+    length = preprocessor.output_length(source.signal_length)
+
+    def _read_block(i):
+        x, y, _ = source.read(blocks[i])
+        x = preprocessor.transform(x, source.channels_last)
+        if augment is not None:
+            x = augment(x)
+        if shuffle:
+            p = rng.permutation(y.size)
+            x, y = x[p], y[p]
+        return x, y.astype("int32")
+
+    def _load_block(i):
+        x, y = tf.numpy_function(_read_block, [i], [tf.float32, tf.int32])
+        x.set_shape([None, length, 2])
+        y.set_shape([None])
+        if one_hot:
+            y = tf.one_hot(y, source.n_classes)
+        return x, y
+
+    ds = tf.data.Dataset.range(n_blocks)
+    if shuffle:
+        ds = ds.shuffle(n_blocks, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(
+        _load_block, num_parallel_calls=num_parallel_calls, deterministic=not shuffle
+    )
+    ds = ds.unbatch()
+    if shuffle:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.apply(
+        tf.data.experimental.assert_cardinality(-(-indices.size // batch_size))
+    )
+
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def make_bucketed_dataset(batcher, n_classes, one_hot=True):
+    """Build a tf.data.Dataset of the length-bucketed batches of a batcher
+
+    The signal length of the batches is left unknown in the dataset signature,
+    so a Mod-L network is traced once for all the buckets when training.
+
+    Arguments:
+        batcher (bucketing.BucketedBatcher): signals, labels and buckets. With
+            shuffle the batches are drawn again at every epoch.
+        n_classes (int): number of classes
+        one_hot (bool, optional): one-hot encode the labels. Defaults to True.
+
+    Returns:
+        (tf.data.Dataset): batches of (signals, labels)
+    """
+
+    def _batches():
+        for x, y in batcher:
+            yield x, y.astype("int32")
+
+    ds = tf.data.Dataset.from_generator(
+        _batches,
+        output_signature=(
+            tf.TensorSpec([None, None, 2], tf.float32),
+            tf.TensorSpec([None], tf.int32),
+        ),
+    )
+    if one_hot:
+        ds = ds.map(lambda x, y: (x, tf.one_hot(y, n_classes)))
+    ds = ds.apply(tf.data.experimental.assert_cardinality(len(batcher)))
+    return ds.prefetch(tf.data.AUTOTUNE)
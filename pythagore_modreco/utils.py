@@ -27,22 +27,114 @@
 #
 # 2022 November 25
 
-import time
-from tensorflow.keras.callbacks import Callback
-from numpy.random import choice
+import json
+from numpy import arange, argsort, asarray, cumsum, ravel_multi_index, repeat, unique
+from numpy import percentile
+from numpy import random
+from numpy.random import default_rng
 
+# names of the networks of neural_nets_keras, get_<name> builds them
+NETWORKS = ["LModCNN", "LModCNNResNetRelu", "RMLConvNet", "RMLCNNVGG", "RMLResNet"]
 
-class TimeHistory(Callback):
-    """Keras callback tto monitor execution time during training"""
+# networks accepting a dynamic signal length
+DYNAMIC_NETWORKS = ["LModCNN", "LModCNNResNetRelu"]
 
-    def on_train_begin(self, logs={}):
-        self.times = []
 
-    def on_epoch_begin(self, epoch, logs={}):
-        self.epoch_time_start = time.time()
+def __getattr__(name):
+    # TimeHistory depends on TensorFlow: only import it when it is requested,
+    # so that the data utilities can be used without loading TensorFlow
+    if name == "TimeHistory":
+        from .callbacks import TimeHistory
 
-    def on_epoch_end(self, epoch, logs={}):
-        self.times.append(time.time() - self.epoch_time_start)
+        return TimeHistory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_rng(seed):
+    """Random generator used to split datasets
+
+    Args:
+        seed (None, int or numpy.random.Generator): if None the global numpy
+            random state is used, so that numpy.random.seed applies
+
+    Returns:
+        random generator exposing permutation
+    """
+    if seed is None:
+        return random
+    return default_rng(seed)
+
+
+def _strata_codes(strata):
+    """Combine one or several label arrays into a single integer code per example
+
+    Args:
+        strata (array or tuple of arrays): 1-D arrays of the same length
+
+    Returns:
+        (array of int): code of the combination of labels of each example
+    """
+    if not isinstance(strata, (tuple, list)):
+        strata = (strata,)
+    codes, dims = [], []
+    for s in strata:
+        u, c = unique(asarray(s), return_inverse=True)
+        codes.append(c.reshape(-1))
+        dims.append(u.size)
+    return ravel_multi_index(codes, dims)
+
+
+def split_indices(n, p_train=0.8, p_valid=0.0, p_test=0.0, strata=None, seed=None):
+    """Draw shuffled train, validation and test indices from a single permutation
+
+    Arguments:
+    n (int): number of examples
+    p_train (float): proportion of training data
+    p_valid (float): proportion of validation data
+    p_test (float): proportion of test data
+    strata (array or tuple of arrays): if given, e.g. (class_idx, snrs), the
+        proportions are applied within each combination of labels so that all
+        splits share the same distribution
+    seed (None, int or numpy.random.Generator): random seed or generator.
+        If None the global numpy random state is used.
+
+    Returns:
+        (tuple of arrays): train, validation and test indices
+    """
+    if p_train + p_valid + p_test > 1.0 + 1e-9:
+        raise ValueError(
+            f"p_train + p_valid + p_test must be <= 1, got {p_train + p_valid + p_test}"
+        )
+
+    rng = _get_rng(seed)
+    perm = rng.permutation(n)
+
+    if strata is None:
+        n_train = int(n * p_train)
+        n_valid = int(n * p_valid)
+        n_test = int(n * p_test)
+        return (
+            perm[:n_train],
+            perm[n_train : n_train + n_valid],
+            perm[n_train + n_valid : n_train + n_valid + n_test],
+        )
+
+    # group the shuffled examples by stratum and rank them within it
+    codes = _strata_codes(strata)
+    order = perm[argsort(codes[perm], kind="stable")]
+    _, counts = unique(codes, return_counts=True)
+    starts = cumsum(counts) - counts
+    rank = arange(n) - repeat(starts, counts)
+
+    n_train = repeat((counts * p_train).astype(int), counts)
+    n_valid = n_train + repeat((counts * p_valid).astype(int), counts)
+    n_test = n_valid + repeat((counts * p_test).astype(int), counts)
+
+    return (
+        rng.permutation(order[rank < n_train]),
+        rng.permutation(order[(rank >= n_train) & (rank < n_valid)]),
+        rng.permutation(order[(rank >= n_valid) & (rank < n_test)]),
+    )
 
 
 def split_dataset(
@@ -51,6 +143,9 @@ def split_dataset(
     p_train=0.8,
     p_valid=0.0,
     p_test=0.0,
+    strata=None,
+    seed=None,
+    return_indices=False,
 ):
     """Function to split and shuffle a dataset into train, validation and test
     splits.
@@ -61,37 +156,84 @@ def split_dataset(
     p_train (float): proportion of training data
     p_valid (float): proportion of validation data
     p_test (float): proportion of test data
+    strata (array or tuple of arrays): stratify the splits on these labels,
+        e.g. (class_idx, snrs), see split_indices
+    seed (None, int or numpy.random.Generator): random seed or generator.
+        If None the global numpy random state is used.
+    return_indices (bool): only return the train, validation and test indices,
+        without copying data and labels
     """
+    train_idx, valid_idx, test_idx = split_indices(
+        data.shape[0], p_train, p_valid, p_test, strata=strata, seed=seed
+    )
 
-    def aux(D_, L_, p_, idx_):
-
-        n_tot_examples_ = D_.shape[0]
-        n_taken_examples_ = int(n_tot_examples_ * p_)
-        chosen_idx_ = choice(idx_, size=n_taken_examples_, replace=False)
-        free_indexes_ = list(set(idx_) - set(chosen_idx_))
-
-        return D_[chosen_idx_], L_[chosen_idx_], chosen_idx_, free_indexes_
+    if return_indices:
+        return train_idx, valid_idx, test_idx
 
     D = data
     L = labels
 
-    idx = range(0, D.shape[0])
-    X_train, Y_train, train_idx, free_idx = aux(D, L, p_train, idx)
-
-    idx = free_idx
-    X_valid, Y_valid, valid_idx, free_idx = aux(D, L, p_valid, idx)
-
-    idx = free_idx
-    X_test, Y_test, test_idx, free_idx = aux(D, L, p_test, idx)
-
     return (
-        X_train,
-        Y_train,
+        D[train_idx],
+        L[train_idx],
         train_idx,
-        X_valid,
-        Y_valid,
+        D[valid_idx],
+        L[valid_idx],
         valid_idx,
-        X_test,
-        Y_test,
+        D[test_idx],
+        L[test_idx],
         test_idx,
     )
+
+
+def read_profile(fname):
+    """Read the JSON lines log written by callbacks.StepProfiler
+
+    Arguments:
+    fname (str): path of the log
+
+    Returns:
+        (tuple of lists): step records and epoch records
+    """
+    steps, epochs = [], []
+    with open(fname) as f:
+        for line in f:
+            record = json.loads(line)
+            (steps if record["type"] == "step" else epochs).append(record)
+    return steps, epochs
+
+
+def summarize_profile(steps, skip_first_epoch=True):
+    """Aggregate the step records of callbacks.StepProfiler
+
+    Arguments:
+    steps (list of dict): step records, see read_profile
+    skip_first_epoch (bool): ignore the first epoch, which includes the graph
+        tracing, when later epochs exist
+
+    Returns:
+        (dict): step time percentiles in ms, mean input wait in ms and fraction
+            of the step time spent waiting for input (None unless the data went
+            through StepProfiler.timed), mean samples/s and peak RSS in MB
+    """
+    if not steps:
+        raise ValueError("the profile has no step records")
+    if skip_first_epoch and any(s["epoch"] > steps[0]["epoch"] for s in steps):
+        steps = [s for s in steps if s["epoch"] > steps[0]["epoch"]]
+    step_time = asarray([s["step_time"] for s in steps]) * 1000.0
+    timed = all(s["input_wait"] is not None for s in steps)
+    input_wait = asarray([s["input_wait"] for s in steps if timed]) * 1000.0
+    p50, p95, p99 = percentile(step_time, [50, 95, 99])
+    samples = [s["samples_per_s"] for s in steps if s["samples_per_s"] is not None]
+    return {
+        "n_steps": len(steps),
+        "step_p50_ms": float(p50),
+        "step_p95_ms": float(p95),
+        "step_p99_ms": float(p99),
+        "input_wait_mean_ms": float(input_wait.mean()) if timed else None,
+        "input_wait_fraction": (
+            float(input_wait.sum() / step_time.sum()) if timed else None
+        ),
+        "samples_per_s": float(sum(samples) / len(samples)) if samples else None,
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in steps),
+    }